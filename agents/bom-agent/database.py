@@ -1,20 +1,76 @@
 import os
-from neo4j import GraphDatabase
+from typing import Any, List
+from neo4j import GraphDatabase, AsyncGraphDatabase, Record
+
+from .cache import bom_cache
 
 URI = os.getenv("NEO4J_URI", "bolt://neo4j:7687")
 AUTH = (os.getenv("NEO4J_USER", "neo4j"), os.getenv("NEO4J_PASSWORD", "password"))
+POOL_SIZE = int(os.getenv("NEO4J_POOL_SIZE", "100"))
+POOL_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_POOL_ACQUISITION_TIMEOUT", "30"))
 
+# Sync driver: startup seeding and batch ingestion
 driver = GraphDatabase.driver(URI, auth=AUTH)
 
+# Async driver: request handlers. Sized explicitly so concurrency is bounded by
+# Neo4j connections rather than the FastAPI threadpool.
+async_driver = AsyncGraphDatabase.driver(
+    URI,
+    auth=AUTH,
+    max_connection_pool_size=POOL_SIZE,
+    connection_acquisition_timeout=POOL_ACQUISITION_TIMEOUT,
+)
+
 def get_db():
     return driver.session()
 
-def seed_bom_data():
+async def _collect(tx, query: str, params: dict) -> List[Record]:
+    result = await tx.run(query, **params)
+    return [record async for record in result]
+
+async def read_query(query: str, **params: Any) -> List[Record]:
+    """Runs a read-only query in a managed read transaction on the async driver."""
+    async with async_driver.session() as session:
+        return await session.execute_read(_collect, query, params)
+
+# Idempotent (IF NOT EXISTS) so this is safe to run on every startup.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT part_name_unique IF NOT EXISTS FOR (p:Part) REQUIRE p.name IS UNIQUE",
+    "CREATE INDEX part_type IF NOT EXISTS FOR (p:Part) ON (p.type)",
+    "CREATE INDEX supplier_name IF NOT EXISTS FOR (s:Supplier) ON (s.name)",
+    "CREATE INDEX supplier_country IF NOT EXISTS FOR (s:Supplier) ON (s.country)",
+]
+
+def ensure_schema():
+    """
+    Creates the uniqueness constraint and lookup indexes the BOM queries rely on.
+    The Part.name constraint is backed by a range index, so MATCH (p:Part {name: ...})
+    becomes an index seek instead of a label scan.
+    """
+    with driver.session() as session:
+        for statement in SCHEMA_STATEMENTS:
+            session.run(statement).consume()
+        # Block until indexes are online so the first queries don't fall back to scans
+        session.run("CALL db.awaitIndexes(300)").consume()
+    print("✅ BOM schema constraints and indexes ensured")
+
+def graph_is_populated() -> bool:
+    with driver.session() as session:
+        record = session.run("MATCH (p:Part) RETURN p LIMIT 1").single()
+        return record is not None
+
+def seed_bom_data(force: bool = False):
     """
     Seeds the Neo4j database with comprehensive, realistic automotive BOM data.
     Includes 100+ cars from Toyota, GM, and Honda with realistic suppliers.
+    Skipped when the graph already has parts, unless `force` (or BOM_FORCE_RESEED=true)
+    is set, in which case the graph is wiped and reseeded.
     """
-    
+    force = force or os.getenv("BOM_FORCE_RESEED", "false").lower() == "true"
+    if not force and graph_is_populated():
+        print("BOM graph already populated, skipping seed...")
+        return False
+
     # Clear existing data
     clear_query = "MATCH (n) DETACH DELETE n"
     
@@ -440,9 +496,9 @@ def seed_bom_data():
     
     with driver.session() as session:
         try:
-            # Clear existing data
-            session.run(clear_query)
-            print("Cleared existing BOM data.")
+            if force:
+                session.run(clear_query)
+                print("Cleared existing BOM data.")
             
             # Seed new comprehensive data
             session.run(cypher_query)
@@ -450,8 +506,12 @@ def seed_bom_data():
             print("   - Added realistic suppliers (Denso, Bosch, Continental, BorgWarner, etc.)")
             print("   - Added comprehensive parts library")
             print("   - Added detailed vehicle-to-part relationships")
+            bom_cache.invalidate()
+            return True
         except Exception as e:
             print(f"❌ Error seeding BOM data: {e}")
+            return False
 
-def close_db():
+async def close_db():
     driver.close()
+    await async_driver.close()
@@ -0,0 +1,187 @@
+"""
+Incremental, batched BOM ingestion for Neo4j.
+
+Reads parts, suppliers and edges from CSV/JSONL files (or the shared
+cars.json dataset) and upserts them with `UNWIND $rows` batches, so load
+time and transaction size scale with the batch size rather than the graph.
+
+File layout for a data directory (each file optional, .csv or .jsonl):
+    parts.*        name, type
+    suppliers.*    name, country
+    composed_of.*  parent, child
+    supplied_by.*  part, supplier
+
+Usage:
+    python -m agent.ingest <dir-or-cars.json> [...] [--batch-size N]
+
+The CLI runs in its own process, so after writing it asks the running BOM
+agent (BOM_AGENT_URL) to invalidate its cache and the Orchestrator's.
+"""
+import os
+import csv
+import json
+import time
+import argparse
+import requests
+from typing import Dict, List, Any, Iterable, Iterator
+
+from .database import driver, ensure_schema
+from .cache import bom_cache
+
+DEFAULT_BATCH_SIZE = int(os.getenv("BOM_INGEST_BATCH_SIZE", "1000"))
+BOM_AGENT_URL = os.getenv("BOM_AGENT_URL", "http://localhost:8004")
+
+ENTITIES = ["parts", "suppliers", "composed_of", "supplied_by"]
+
+# Nodes are written before edges so the edge MATCHes always find their endpoints.
+UPSERT_QUERIES = {
+    "parts": """
+    UNWIND $rows AS row
+    MERGE (p:Part {name: row.name})
+    SET p.type = coalesce(row.type, p.type)
+    """,
+    "suppliers": """
+    UNWIND $rows AS row
+    MERGE (s:Supplier {name: row.name})
+    SET s.country = coalesce(row.country, s.country)
+    """,
+    "composed_of": """
+    UNWIND $rows AS row
+    MATCH (parent:Part {name: row.parent})
+    MATCH (child:Part {name: row.child})
+    MERGE (parent)-[:COMPOSED_OF]->(child)
+    """,
+    "supplied_by": """
+    UNWIND $rows AS row
+    MATCH (p:Part {name: row.part})
+    MATCH (s:Supplier {name: row.supplier})
+    MERGE (p)-[:SUPPLIED_BY]->(s)
+    """,
+}
+
+def empty_dataset() -> Dict[str, List[Dict[str, Any]]]:
+    return {entity: [] for entity in ENTITIES}
+
+def _read_rows(path: str) -> List[Dict[str, Any]]:
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        return [dict(row) for row in csv.DictReader(f)]
+
+def load_directory(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Loads `<entity>.csv` / `<entity>.jsonl` files from a data directory."""
+    dataset = empty_dataset()
+    for entity in ENTITIES:
+        for ext in (".csv", ".jsonl"):
+            file_path = os.path.join(path, entity + ext)
+            if os.path.exists(file_path):
+                dataset[entity].extend(_read_rows(file_path))
+    return dataset
+
+def rows_from_cars_data(data: dict) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Flattens the shared cars.json format into ingestion rows:
+    each car becomes a Product part composed of its supplied materials.
+    """
+    dataset = empty_dataset()
+    seen_parts = set()
+    seen_suppliers = set()
+
+    def add_part(name: str, part_type: str):
+        if name not in seen_parts:
+            seen_parts.add(name)
+            dataset["parts"].append({"name": name, "type": part_type})
+
+    for car in data.get("cars", []):
+        vehicle = f"{car.get('year', '')} {car['make']} {car['model']}".strip()
+        add_part(vehicle, "Product")
+        for supplier in car.get("suppliers", []):
+            if supplier["name"] not in seen_suppliers:
+                seen_suppliers.add(supplier["name"])
+                dataset["suppliers"].append({"name": supplier["name"], "country": supplier.get("country")})
+            for material in supplier.get("materials", []):
+                add_part(material, "Component")
+                dataset["composed_of"].append({"parent": vehicle, "child": material})
+                dataset["supplied_by"].append({"part": material, "supplier": supplier["name"]})
+    return dataset
+
+def load_source(path: str) -> Dict[str, List[Dict[str, Any]]]:
+    if os.path.isdir(path):
+        return load_directory(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return rows_from_cars_data(json.load(f))
+
+def _batches(rows: List[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    for start in range(0, len(rows), batch_size):
+        yield rows[start:start + batch_size]
+
+def ingest(dataset: Dict[str, List[Dict[str, Any]]], batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    """
+    Upserts a dataset in batches of `batch_size` rows per transaction.
+    MERGE keeps this incremental: re-running with the same rows is a no-op.
+    Returns per-entity counts plus overall rows/second.
+    """
+    stats: Dict[str, Any] = {"batch_size": batch_size, "entities": {}}
+    started = time.perf_counter()
+    total = 0
+
+    with driver.session() as session:
+        for entity in ENTITIES:
+            rows = dataset.get(entity, [])
+            entity_started = time.perf_counter()
+            batches = 0
+            for batch in _batches(rows, batch_size):
+                session.execute_write(lambda tx, b=batch: tx.run(UPSERT_QUERIES[entity], rows=b).consume())
+                batches += 1
+            elapsed = time.perf_counter() - entity_started
+            stats["entities"][entity] = {
+                "rows": len(rows),
+                "batches": batches,
+                "seconds": round(elapsed, 3),
+            }
+            total += len(rows)
+
+    # Cached lookups may now be missing parts/edges that were just written
+    # (this process only; see notify_agent for the running BOM agent)
+    bom_cache.invalidate()
+
+    elapsed = time.perf_counter() - started
+    stats["rows"] = total
+    stats["seconds"] = round(elapsed, 3)
+    stats["rows_per_second"] = round(total / elapsed, 1) if elapsed > 0 else None
+    print(f"✅ Ingested {total} BOM rows in {elapsed:.2f}s ({stats['rows_per_second']} rows/s, batch size {batch_size})")
+    return stats
+
+def ingest_paths(paths: Iterable[str], batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+    dataset = empty_dataset()
+    for path in paths:
+        source = load_source(path)
+        for entity in ENTITIES:
+            dataset[entity].extend(source[entity])
+    return ingest(dataset, batch_size=batch_size)
+
+def notify_agent():
+    """Invalidates the running BOM agent's cache (and, through it, the Orchestrator's)."""
+    try:
+        response = requests.post(f"{BOM_AGENT_URL}/cache/invalidate", timeout=10)
+        response.raise_for_status()
+        print(f"✅ Invalidated BOM caches via {BOM_AGENT_URL}")
+    except Exception as e:
+        print(f"⚠️ Could not invalidate BOM caches via {BOM_AGENT_URL}: {e}. "
+              f"Cached BOMs may be stale until their TTL expires.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Batched BOM ingestion into Neo4j")
+    parser.add_argument("paths", nargs="+", help="Data directories or cars.json-style files")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    ensure_schema()
+    stats = ingest_paths(args.paths, batch_size=args.batch_size)
+    notify_agent()
+    print(json.dumps(stats, indent=2))
+    driver.close()
+
+if __name__ == "__main__":
+    main()
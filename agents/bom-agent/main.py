@@ -1,19 +1,30 @@
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import uvicorn
 import os
 
-from .database import seed_bom_data, get_db, close_db
-from shared.utils import register_agent
+from .database import seed_bom_data, ensure_schema, read_query, close_db
+from .ingest import ingest_paths
+from .cache import bom_cache
+from shared.utils import register_agent, invalidate_orchestrator_cache
 
 app = FastAPI(title="BOM Agent")
 
+DEFAULT_TREE_DEPTH = int(os.getenv("BOM_TREE_DEFAULT_DEPTH", "5"))
+MAX_TREE_DEPTH = int(os.getenv("BOM_TREE_MAX_DEPTH", "10"))
+MAX_ENTITIES = int(os.getenv("BOM_MAX_ENTITIES", "50000"))
+
 @app.on_event("startup")
 def on_startup():
     # Wait for Neo4j to be ready in real prod, but for now just try seed
     try:
+        ensure_schema()
         seed_bom_data()
+        # Optional extra data (comma-separated dirs or cars.json-style files), upserted incrementally
+        ingest_sources = [p for p in os.getenv("BOM_INGEST_PATHS", "").split(",") if p.strip()]
+        if ingest_sources:
+            ingest_paths(ingest_sources)
     except Exception as e:
         print(f"Startup seeding failed (Neo4j might be warming up): {e}")
         
@@ -32,10 +43,50 @@ def on_startup():
                 },
                 "required": ["part_name"]
             },
-            "instructions": "Use this skill FIRST to get the composition and suppliers of a part. Only if this fails or returns no results should you try other discovery tools."
+            "instructions": "Use this skill FIRST to get the composition and suppliers of a part. Only if this fails or returns no results should you try other discovery tools.",
+            "route": {
+                "triggers": [r"\bbom\b", r"bill of materials", r"\bcomposed of\b", r"\bcomponents of\b", r"\bwhat(?:'s| is) in\b"],
+                "entity_source": "/entities"
+            }
+        },
+        {
+            "id": "get-bom-tree",
+            "name": "Get Full BOM Tree",
+            "description": "Expands the full multi-level Bill of Materials for a part (or vehicle) in one call, returning a nested tree with suppliers at every node.",
+            "inputModes": ["text"],
+            "outputModes": ["json"],
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "part_name": {"type": "string", "description": "Name of the root part or vehicle (e.g., '2024 Toyota Camry')"},
+                    "max_depth": {"type": "integer", "description": f"How many levels to expand (1-{MAX_TREE_DEPTH}, default {DEFAULT_TREE_DEPTH})"}
+                },
+                "required": ["part_name"]
+            },
+            "instructions": "Use get-bom-tree instead of repeated get-bom calls when the user asks for the full or multi-level BOM, all sub-components, or every supplier involved in a vehicle or assembly."
+        },
+        {
+            "id": "get-bom-batch",
+            "name": "Get Bill of Materials (Batch)",
+            "description": "Retrieves the immediate children and suppliers for many parts or vehicles in one call. Returns results keyed by part name and the list of names that were not found.",
+            "inputModes": ["text"],
+            "outputModes": ["json"],
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "part_names": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Names of the parts or vehicles to look up"
+                    }
+                },
+                "required": ["part_names"]
+            },
+            "instructions": "Use get-bom-batch instead of calling get-bom repeatedly when the user asks about several parts or vehicles at once (e.g. a fleet report)."
         }
     ]
-    register_agent("bom-agent", 8004, skills)
+    # BOM reads are idempotent and cheap; results may be reused as long as our own cache would
+    register_agent("bom-agent", 8004, skills, cache={"cacheable": True, "ttl_seconds": bom_cache.ttl_seconds, "cost": 1.0})
 
 @app.get("/.well-known/agent.json")
 def get_agent_card():
@@ -44,13 +95,27 @@ def get_agent_card():
         "description": "Bill of Materials Graph Agent",
         "url": "http://bom-agent:8004",
         "version": "1.0.0",
-        "skills": [{"id": "get-bom", "name": "Get Bill of Materials"}]
+        "skills": [
+            {"id": "get-bom", "name": "Get Bill of Materials"},
+            {"id": "get-bom-tree", "name": "Get Full BOM Tree"},
+            {"id": "get-bom-batch", "name": "Get Bill of Materials (Batch)"}
+        ]
     }
 
 
+@app.post("/cache/invalidate")
+def invalidate_cache():
+    """
+    Called by out-of-process writers (e.g. `python -m agent.ingest`) so this
+    process and the Orchestrator's tool cache stop serving pre-write BOMs.
+    """
+    bom_cache.invalidate()
+    invalidate_orchestrator_cache("bom-agent")
+    return {"status": "invalidated"}
+
 @app.on_event("shutdown")
-def on_shutdown():
-    close_db()
+async def on_shutdown():
+    await close_db()
 
 class BOMRequest(BaseModel):
     part_name: str
@@ -61,36 +126,173 @@ class BOMResponse(BaseModel):
     suppliers: List[Dict[str, Any]]
 
 @app.post("/get-bom", response_model=BOMResponse)
-def get_bom(request: BOMRequest):
+async def get_bom(request: BOMRequest):
     """
     Retrieves the immediate children and suppliers of a given part.
     """
+    cache_key = ("get-bom", request.part_name, 1)
+    cached = bom_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Grouping by p means a missing part yields no row (-> 404, never cached)
     query = """
     MATCH (p:Part {name: $part_name})
     OPTIONAL MATCH (p)-[:COMPOSED_OF]->(child:Part)
+    WITH p, collect(DISTINCT child) AS children
     OPTIONAL MATCH (p)-[:SUPPLIED_BY]->(s:Supplier)
-    RETURN collect(DISTINCT child) as children, collect(DISTINCT s) as suppliers
+    RETURN p.name AS name, children, collect(DISTINCT s) AS suppliers
     """
-    
-    with get_db() as session:
-        result = session.run(query, part_name=request.part_name)
-        record = result.single()
-        
-        if not record:
-            raise HTTPException(status_code=404, detail="Part not found")
-            
-        children = [{"name": c["name"], "type": c["type"]} for c in record["children"] if c]
-        suppliers = [{"name": s["name"], "country": s["country"]} for s in record["suppliers"] if s]
-        
-        return BOMResponse(
-            part_name=request.part_name,
-            children=children,
-            suppliers=suppliers
-        )
+
+
+    records = await read_query(query, part_name=request.part_name)
+    if not records:
+        raise HTTPException(status_code=404, detail="Part not found")
+    record = records[0]
+
+    children = [{"name": c["name"], "type": c["type"]} for c in record["children"] if c]
+    suppliers = [{"name": s["name"], "country": s["country"]} for s in record["suppliers"] if s]
+
+    response = BOMResponse(
+        part_name=request.part_name,
+        children=children,
+        suppliers=suppliers
+    )
+    bom_cache.set(cache_key, response)
+    return response
+
+@app.get("/entities")
+async def list_entities():
+    """Part names for the orchestrator's fast-path router, as get-bom arguments."""
+    records = await read_query("MATCH (p:Part) RETURN p.name AS name LIMIT $limit", limit=MAX_ENTITIES)
+    return [{"match": r["name"], "args": {"part_name": r["name"]}} for r in records]
+
+class BOMBatchRequest(BaseModel):
+    part_names: List[str]
+
+class BOMBatchResponse(BaseModel):
+    results: Dict[str, BOMResponse]
+    not_found: List[str]
+
+@app.post("/get-bom-batch", response_model=BOMBatchResponse)
+async def get_bom_batch(request: BOMBatchRequest):
+    """
+    Resolves many parts in one UNWIND query. Cached parts are served from
+    the BOM cache; only the misses go to Neo4j.
+    """
+    names = list(dict.fromkeys(request.part_names))  # dedupe, keep order
+    results: Dict[str, BOMResponse] = {}
+    missing = []
+    for name in names:
+        cached = bom_cache.get(("get-bom", name, 1))
+        if cached is not None:
+            results[name] = cached
+        else:
+            missing.append(name)
+
+    if missing:
+        query = """
+        UNWIND $names AS name
+        MATCH (p:Part {name: name})
+        OPTIONAL MATCH (p)-[:COMPOSED_OF]->(child:Part)
+        WITH p, name, collect(DISTINCT child) AS children
+        OPTIONAL MATCH (p)-[:SUPPLIED_BY]->(s:Supplier)
+        RETURN name, children, collect(DISTINCT s) AS suppliers
+        """
+        for record in await read_query(query, names=missing):
+            response = BOMResponse(
+                part_name=record["name"],
+                children=[{"name": c["name"], "type": c["type"]} for c in record["children"] if c],
+                suppliers=[{"name": s["name"], "country": s["country"]} for s in record["suppliers"] if s]
+            )
+            bom_cache.set(("get-bom", record["name"], 1), response)
+            results[record["name"]] = response
+
+    return BOMBatchResponse(
+        results={name: results[name] for name in names if name in results},
+        not_found=[name for name in names if name not in results]
+    )
+
+class BOMTreeRequest(BaseModel):
+    part_name: str
+    max_depth: Optional[int] = None
+
+class BOMTreeNode(BaseModel):
+    name: str
+    type: Optional[str] = None
+    suppliers: List[Dict[str, Any]] = []
+    children: List["BOMTreeNode"] = []
+
+class BOMTreeResponse(BaseModel):
+    part_name: str
+    depth: int
+    node_count: int
+    tree: BOMTreeNode
+
+def _build_tree(name: str, nodes: Dict[str, Dict[str, Any]], depth: int, path: tuple = ()) -> BOMTreeNode:
+    node = nodes[name]
+    children = []
+    if depth > 0:
+        for child in sorted(node["children"]):
+            # Guard against cycles in malformed data
+            if child in nodes and child not in path:
+                children.append(_build_tree(child, nodes, depth - 1, path + (name,)))
+    return BOMTreeNode(name=name, type=node["type"], suppliers=node["suppliers"], children=children)
+
+@app.post("/get-bom-tree", response_model=BOMTreeResponse)
+async def get_bom_tree(request: BOMTreeRequest):
+    """
+    Expands the full BOM below a part in a single variable-length traversal.
+    Returns a nested tree (AGUIComponentType.BOM_TREE) with suppliers at each node.
+    """
+    depth = request.max_depth or DEFAULT_TREE_DEPTH
+    depth = max(1, min(depth, MAX_TREE_DEPTH))
+
+    cache_key = ("get-bom-tree", request.part_name, depth)
+    cached = bom_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    # Variable-length bounds can't be parameterised in Cypher; depth is a clamped int.
+    # Edges are collected while expanding (no per-edge membership test), and the
+    # whole tree comes back as a single row of nodes plus (parent, child) pairs.
+    query = f"""
+    MATCH (root:Part {{name: $part_name}})
+    OPTIONAL MATCH path = (root)-[:COMPOSED_OF*1..{depth}]->(:Part)
+    UNWIND CASE WHEN path IS NULL THEN [null] ELSE relationships(path) END AS r
+    WITH root, collect(DISTINCT r) AS rels
+    UNWIND [root] + [r IN rels | endNode(r)] AS n
+    WITH DISTINCT rels, n
+    OPTIONAL MATCH (n)-[:SUPPLIED_BY]->(s:Supplier)
+    WITH rels, n, collect(DISTINCT s {{.name, .country}}) AS suppliers
+    WITH rels, collect({{name: n.name, type: n.type, suppliers: suppliers}}) AS nodes
+    RETURN nodes, [r IN rels | [startNode(r).name, endNode(r).name]] AS edges
+    """
+
+    records = await read_query(query, part_name=request.part_name)
+
+    if not records:
+        raise HTTPException(status_code=404, detail="Part not found")
+
+    nodes = {
+        n["name"]: {"type": n["type"], "suppliers": n["suppliers"], "children": []}
+        for n in records[0]["nodes"]
+    }
+    for parent, child in records[0]["edges"]:
+        nodes[parent]["children"].append(child)
+
+    response = BOMTreeResponse(
+        part_name=request.part_name,
+        depth=depth,
+        node_count=len(nodes),
+        tree=_build_tree(request.part_name, nodes, depth)
+    )
+    bom_cache.set(cache_key, response)
+    return response
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    return {"status": "healthy", "cache": bom_cache.stats()}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8004)))
@@ -0,0 +1,133 @@
+"""
+Result cache for find-material.
+
+Two tiers, both keyed by a normalized part name ("Brake Pads " -> "brake pad"):
+  1. Catalog: the seeded Postgres `materials` table (when DATABASE_URL is set),
+     so known parts are answered without calling the LLM at all.
+  2. Results: a local SQLite table of previous LLM answers with a TTL.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+from typing import Any, Dict, Optional
+
+CACHE_PATH = os.getenv("MATERIAL_CACHE_PATH", "material_cache.db")
+CACHE_TTL_SECONDS = int(os.getenv("MATERIAL_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+CATALOG_REFRESH_SECONDS = int(os.getenv("MATERIAL_CATALOG_REFRESH_SECONDS", "3600"))
+# After a failed load (e.g. Postgres still starting), retry this soon instead of waiting a full refresh
+CATALOG_RETRY_SECONDS = int(os.getenv("MATERIAL_CATALOG_RETRY_SECONDS", "30"))
+DATABASE_URL = os.getenv("DATABASE_URL")
+
+def normalize_part_name(name: str) -> str:
+    """Lowercases, strips punctuation/extra spaces and singularizes each word."""
+    words = re.sub(r"[^a-z0-9/.()]+", " ", name.lower()).split()
+    singular = []
+    for word in words:
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        singular.append(word)
+    return " ".join(singular)
+
+class MaterialCache:
+    def __init__(self, path: str = CACHE_PATH, ttl_seconds: int = CACHE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS material_results ("
+            " key TEXT PRIMARY KEY, result TEXT NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._catalog: Dict[str, Dict[str, Any]] = {}
+        self._catalog_engine = None
+        self._catalog_next_load = 0.0
+        self.catalog_hits = 0
+        self.hits = 0
+        self.misses = 0
+
+    # --- Catalog tier (Postgres materials table) ---
+
+    def _get_catalog_engine(self):
+        if self._catalog_engine is None:
+            from sqlalchemy import create_engine
+            self._catalog_engine = create_engine(DATABASE_URL, pool_pre_ping=True, pool_size=1, max_overflow=0)
+        return self._catalog_engine
+
+    def _load_catalog(self):
+        if not DATABASE_URL:
+            self._catalog_next_load = float("inf")
+            return
+        try:
+            from sqlalchemy import text
+            query = text("""
+                SELECT m.name, m.category, m.typical_oem_status, m.primary_supplier,
+                       m.average_price_usd, s.country
+                FROM materials m
+                LEFT JOIN LATERAL (
+                    SELECT country FROM suppliers WHERE suppliers.name = m.primary_supplier LIMIT 1
+                ) s ON true
+            """)
+            with self._get_catalog_engine().connect() as conn:
+                rows = conn.execute(query).mappings().all()
+            self._catalog = {normalize_part_name(r["name"]): dict(r) for r in rows}
+            self._catalog_next_load = time.time() + CATALOG_REFRESH_SECONDS
+            print(f"Loaded {len(self._catalog)} catalog materials for find-material")
+        except Exception as e:
+            # Keep any previous catalog and try again soon
+            self._catalog_next_load = time.time() + CATALOG_RETRY_SECONDS
+            print(f"Material catalog unavailable (retrying in {CATALOG_RETRY_SECONDS}s), using result cache only: {e}")
+
+    def catalog_lookup(self, part_name: str) -> Optional[Dict[str, Any]]:
+        if time.time() >= self._catalog_next_load:
+            self._load_catalog()
+        row = self._catalog.get(normalize_part_name(part_name))
+        if row is None:
+            return None
+        self.catalog_hits += 1
+        price = row.get("average_price_usd")
+        return {
+            "part_name": row["name"],
+            "oem_status": row.get("typical_oem_status") or "Unknown",
+            "manufacturer": row.get("primary_supplier") or "Unknown",
+            "origin_country": row.get("country") or "Unknown",
+            "average_price": f"${price:,.2f}" if price is not None else "Unknown",
+            "details": f"{row['name']} ({row.get('category') or 'component'}) from the internal materials catalog.",
+        }
+
+    # --- Result tier (SQLite) ---
+
+    def get(self, part_name: str) -> Optional[Dict[str, Any]]:
+        key = normalize_part_name(part_name)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, stored_at FROM material_results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or time.time() - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, part_name: str, result: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO material_results (key, result, stored_at) VALUES (?, ?, ?)",
+                (normalize_part_name(part_name), json.dumps(result), time.time()),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "catalog_entries": len(self._catalog),
+            "catalog_hits": self.catalog_hits,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+material_cache = MaterialCache()
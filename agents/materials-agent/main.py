@@ -3,11 +3,14 @@ from pydantic import BaseModel, Field
 from typing import Optional
 import uvicorn
 import os
+import asyncio
 from pydantic_ai import Agent, RunContext
 from langfuse import get_client
 
 from shared.utils import register_agent
-from shared.tools.search import get_search_tool, SearchInterface
+from shared.langfuse_config import get_langfuse_client, shutdown_langfuse
+from shared.tools.search import get_search_tool, search_cache_stats, SearchInterface
+from .cache import material_cache
 
 app = FastAPI(title="Materials Agent")
 
@@ -32,7 +35,7 @@ material_agent = Agent(
 @material_agent.tool
 async def search_web(ctx: RunContext[SearchInterface], query: str) -> str:
     """Search the web for information."""
-    result = ctx.deps.search(query)
+    result = await ctx.deps.asearch(query)
     if "error" in result:
         return f"Search Error: {result['error']}"
     return result.get("result", "No results found.")
@@ -41,6 +44,8 @@ async def search_web(ctx: RunContext[SearchInterface], query: str) -> str:
 
 @app.on_event("startup")
 def on_startup():
+    get_langfuse_client()
+
     # Register with Orchestrator using Agent Card Skills
     skills = [
         {
@@ -56,11 +61,16 @@ def on_startup():
                     "part_name": {"type": "string", "description": "Name of the car part"}
                 },
                 "required": ["part_name"]
-            }
+            },
+            "cache": {"cacheable": True, "ttl_seconds": 24 * 3600, "cost": 10.0}
         }
     ]
     register_agent("materials-agent", 8002, skills)
 
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_langfuse()
+
 @app.get("/.well-known/agent.json")
 def get_agent_card():
     return {
@@ -76,6 +86,13 @@ class MaterialRequest(BaseModel):
 
 @app.post("/find-material", response_model=MaterialResult)
 async def find_material(request: MaterialRequest):
+    # Known catalog parts and repeat lookups never reach the LLM
+    cached = await asyncio.to_thread(material_cache.catalog_lookup, request.part_name)
+    if cached is None:
+        cached = await asyncio.to_thread(material_cache.get, request.part_name)
+    if cached is not None:
+        return MaterialResult(**cached)
+
     # Get the configured search tool (dependency)
     search_tool = get_search_tool(os.getenv("SEARCH_PROVIDER", "google"))
     
@@ -96,23 +113,20 @@ async def find_material(request: MaterialRequest):
                 deps=search_tool
             )
             
-            # Update observation with output
+            # Update observation with output (exported by the background batch processor)
             observation.update(output=result.output.dict())
             
-            # Flush Langfuse to ensure trace is sent
-            langfuse.flush()
-            
+            await asyncio.to_thread(material_cache.set, request.part_name, result.output.model_dump())
             return result.output
             
         except Exception as e:
             print(f"Agent Error: {e}")
             observation.update(level="ERROR", status_message=str(e))
-            langfuse.flush()  # Flush even on error
             raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    return {"status": "healthy", "cache": material_cache.stats(), "search_cache": search_cache_stats()}
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8002)))
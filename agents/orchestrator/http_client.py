@@ -0,0 +1,57 @@
+import os
+import json
+import asyncio
+from typing import Dict, Optional
+
+import httpx
+
+# Default per-call timeout for forwarded tool calls (seconds).
+DEFAULT_TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT_SECONDS", "60"))
+MAX_CONNECTIONS_PER_AGENT = int(os.getenv("TOOL_MAX_CONNECTIONS", "20"))
+MAX_KEEPALIVE_PER_AGENT = int(os.getenv("TOOL_MAX_KEEPALIVE", "10"))
+
+class AgentClientPool:
+    """
+    One long-lived, connection-pooled AsyncClient per agent base URL.
+    Reused across chat streams so tool calls get keep-alive connections
+    instead of a fresh TCP handshake per call.
+    """
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def get(self, agent_url: str) -> httpx.AsyncClient:
+        client = self._clients.get(agent_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                base_url=agent_url,
+                timeout=DEFAULT_TOOL_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=MAX_CONNECTIONS_PER_AGENT,
+                    max_keepalive_connections=MAX_KEEPALIVE_PER_AGENT,
+                ),
+            )
+            self._clients[agent_url] = client
+        return client
+
+    async def post(self, agent_url: str, path: str, payload: dict, timeout: Optional[float] = None):
+        client = self.get(agent_url)
+        response = await client.post(f"/{path}", json=payload, timeout=timeout or DEFAULT_TOOL_TIMEOUT)
+        response.raise_for_status()
+        if response.headers.get("content-type", "").startswith("application/x-ndjson"):
+            # Streaming (batch) skills: collect every line into a list
+            return [json.loads(line) for line in response.text.splitlines() if line.strip()]
+        return response.json()
+
+    async def get_json(self, agent_url: str, path: str, timeout: Optional[float] = None):
+        client = self.get(agent_url)
+        response = await client.get(f"/{path.lstrip('/')}", timeout=timeout or DEFAULT_TOOL_TIMEOUT)
+        response.raise_for_status()
+        return response.json()
+
+    async def aclose(self):
+        clients = list(self._clients.values())
+        self._clients.clear()
+        await asyncio.gather(*(c.aclose() for c in clients), return_exceptions=True)
+
+client_pool = AgentClientPool()
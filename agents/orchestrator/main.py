@@ -5,28 +5,125 @@ import uvicorn
 import os
 import json
 import asyncio
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from .registry import registry
 from shared.protocol import AgentCard, AGUIMessage, AGUIComponent, AGUIComponentType
-from .react_agent import get_react_agent
+from .react_agent import get_react_agent, set_tool_concurrency
+from .http_client import client_pool
+from .router import fast_path_router
+from .planner import plan_and_execute_stream
+from .tool_cache import tool_cache
 
 app = FastAPI(title="Orchestrator Agent")
 
+# "react": LLM picks tools step by step; "plan": one planning call compiles a parallel tool DAG
+ORCHESTRATOR_MODE = os.getenv("ORCHESTRATOR_MODE", "react")
+
+# Tools whose results have a dedicated AG-UI renderer instead of the generic JSON view
+TOOL_COMPONENT_TYPES = {
+    "get-bom-tree": AGUIComponentType.BOM_TREE,
+}
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await client_pool.aclose()
+
 class ChatRequest(BaseModel):
     message: str
+    # Max tool calls run concurrently when the LLM fans out in one step (1 = sequential)
+    max_concurrency: Optional[int] = None
+    # Allow unambiguous lookups to skip the LLM entirely
+    fast_path: bool = True
+    # "react" or "plan"; defaults to ORCHESTRATOR_MODE
+    mode: Optional[str] = None
 
 @app.post("/register")
 def register_agent(agent: AgentCard):
     registry.register_agent(agent)
     return {"status": "registered", "agent": agent.name}
 
-async def generate_stream(message: str):
+@app.delete("/register/{agent_name}")
+def deregister_agent(agent_name: str):
+    if not registry.deregister_agent(agent_name):
+        raise HTTPException(status_code=404, detail="Agent not registered")
+    return {"status": "deregistered", "agent": agent_name}
+
+@app.post("/tool-cache/invalidate/{agent_name}")
+def invalidate_tool_cache(agent_name: str):
+    """Drops cached tool results for an agent whose data changed (e.g. after a BOM ingest)."""
+    tool_cache.evict_agent(agent_name)
+    return {"status": "invalidated", "agent": agent_name}
+
+async def fast_path_stream(match):
+    """Calls the routed skill directly and streams its result as an AG-UI component."""
+    skill = match.skill
+    yield json.dumps({"type": "token", "content": f"{skill.name} for {match.entity}:\n"}) + "\n"
+    try:
+        output = await tool_cache.call(
+            match.agent, skill, match.args,
+            lambda: client_pool.post(match.agent.url, skill.id, match.args, timeout=skill.timeout_seconds)
+        )
+    except Exception as e:
+        yield json.dumps({"type": "token", "content": f"\nError calling {skill.id}: {e}"}) + "\n"
+        return
+    component = AGUIComponent(
+        type=TOOL_COMPONENT_TYPES.get(skill.id, AGUIComponentType.JSON),
+        title=f"Completed: {skill.id}",
+        data={"output": output, "status": "completed", "route": "fast-path"}
+    )
+    yield json.dumps({"type": "component", "component": component.model_dump()}) + "\n"
+
+async def plan_stream(message: str, max_concurrency: Optional[int] = None):
+    """Plan-then-execute: falls back to the ReAct agent if no usable plan comes back."""
+    stream = plan_and_execute_stream(message, max_concurrency, TOOL_COMPONENT_TYPES)
+    try:
+        first = await stream.__anext__()
+    except StopAsyncIteration:
+        return
+    except Exception as e:
+        print(f"Planning failed, falling back to ReAct: {e}")
+        async for chunk in react_stream(message, max_concurrency):
+            yield chunk
+        return
+
+    yield first
+    try:
+        async for chunk in stream:
+            yield chunk
+    except Exception as e:
+        print(f"Stream Error: {e}")
+        yield json.dumps({"type": "token", "content": f"\nError: {str(e)}"}) + "\n"
+
+async def generate_stream(message: str, max_concurrency: Optional[int] = None, fast_path: bool = True, mode: Optional[str] = None):
+    if fast_path:
+        match = await fast_path_router.route(message)
+        if match:
+            async for chunk in fast_path_stream(match):
+                yield chunk
+            return
+
+    if not registry.agents:
+        yield json.dumps({"type": "token", "content": "System is initializing. No agents registered yet. Please wait."}) + "\n"
+        return
+
+    if (mode or ORCHESTRATOR_MODE) == "plan":
+        async for chunk in plan_stream(message, max_concurrency):
+            yield chunk
+    else:
+        async for chunk in react_stream(message, max_concurrency):
+            yield chunk
+
+async def react_stream(message: str, max_concurrency: Optional[int] = None):
     agent_executor = get_react_agent()
     if not agent_executor:
         yield json.dumps({"type": "token", "content": "System is initializing. No agents registered yet. Please wait."}) + "\n"
         return
 
+    # Tool calls from one LLM step run concurrently under this cap; on_tool_end
+    # events below are emitted as each call finishes, not when the step does.
+    set_tool_concurrency(max_concurrency)
+
     # Use astream_events to get granular events
     try:
         async for event in agent_executor.astream_events(
@@ -71,7 +168,7 @@ async def generate_stream(message: str):
                     pass
 
                 log_component = AGUIComponent(
-                    type=AGUIComponentType.JSON,
+                    type=TOOL_COMPONENT_TYPES.get(tool_name, AGUIComponentType.JSON),
                     title=f"Completed: {tool_name}",
                     data={"output": display_data, "status": "completed"},
                     id=run_id
@@ -84,11 +181,17 @@ async def generate_stream(message: str):
 
 @app.post("/chat")
 async def chat(request: ChatRequest):
-    return StreamingResponse(generate_stream(request.message), media_type="application/x-ndjson")
+    return StreamingResponse(generate_stream(request.message, request.max_concurrency, request.fast_path, request.mode), media_type="application/x-ndjson")
 
 @app.get("/health")
 def health():
-    return {"status": "healthy", "agents": list(registry.agents.keys())}
+    return {
+        "status": "healthy",
+        "agents": list(registry.agents.keys()),
+        "registry_generation": registry.generation,
+        "fast_path": fast_path_router.stats(),
+        "tool_cache": tool_cache.stats()
+    }
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8003)))
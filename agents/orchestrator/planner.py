@@ -0,0 +1,270 @@
+"""
+Plan-then-execute orchestration mode.
+
+One planning LLM call compiles the question into a DAG of skill calls, the
+DAG runs with maximum parallelism against the registered agents, and one
+synthesis LLM call writes the answer. LLM round trips stay at two no matter
+how many steps the plan has.
+
+Steps can feed each other:
+  - "{step_id.path}" inside a string arg is replaced by that step's output
+    value (e.g. "{s1.part_name}").
+  - "foreach": "step_id.path" runs the step once per item of a list in a
+    dependency's output, with "{item.path}" substituted from each item
+    (e.g. foreach "s1.suppliers" + {"supplier_name": "{item.name}"}).
+"""
+import os
+import re
+import json
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, Field, ValidationError
+from langchain_openai import ChatOpenAI
+
+from shared.protocol import AGUIComponent, AGUIComponentType
+from .registry import registry
+from .http_client import client_pool
+from .tool_cache import tool_cache
+from .react_agent import get_langfuse_callbacks
+
+PLANNER_MODEL = os.getenv("PLANNER_MODEL", "gpt-4o-mini")
+MAX_PLAN_STEPS = int(os.getenv("PLANNER_MAX_STEPS", "12"))
+MAX_FOREACH_ITEMS = int(os.getenv("PLANNER_MAX_FOREACH_ITEMS", "10"))
+DEFAULT_PLAN_CONCURRENCY = int(os.getenv("TOOL_FANOUT_CONCURRENCY", "4"))
+
+REFERENCE = re.compile(r"\{([A-Za-z_][\w-]*)((?:\.[\w-]+)*)\}")
+
+class PlanStep(BaseModel):
+    id: str
+    skill: str
+    args: Dict[str, Any] = Field(default_factory=dict)
+    depends_on: List[str] = Field(default_factory=list)
+    foreach: Optional[str] = None
+
+class Plan(BaseModel):
+    steps: List[PlanStep]
+
+class PlanError(Exception):
+    pass
+
+_llm: Optional[ChatOpenAI] = None
+
+def get_llm() -> ChatOpenAI:
+    global _llm
+    if _llm is None:
+        _llm = ChatOpenAI(model=PLANNER_MODEL, temperature=0)
+    return _llm
+
+def _skills_catalog() -> str:
+    lines = []
+    for agent in list(registry.agents.values()):
+        for skill in agent.skills:
+            lines.append(f"- {skill.id}: {skill.description} Parameters: {json.dumps(skill.parameters.get('properties', {}))}")
+            if skill.instructions:
+                lines.append(f"  Usage: {skill.instructions}")
+    return "\n".join(lines)
+
+PLANNER_PROMPT = """You are the planner for a supply chain assistant. Compile the user's question into a plan of skill calls.
+
+Available skills:
+{skills}
+
+Return ONLY a JSON object: {{"steps": [{{"id": "s1", "skill": "<skill id>", "args": {{...}}, "depends_on": [], "foreach": null}}]}}
+
+Rules:
+- Use as few steps as possible and make independent steps independent (empty depends_on) so they run in parallel.
+- To use a value from an earlier step, put "{{<step id>.<field>}}" in a string arg and list that step in depends_on.
+- To run a step once per element of a list returned by an earlier step, set "foreach": "<step id>.<list field>" and refer to the element's fields with "{{item.<field>}}". Example: get the suppliers of a part with get-bom (s1), then {{"id": "s2", "skill": "analyze-risk", "args": {{"supplier_name": "{{item.name}}", "country": "{{item.country}}"}}, "depends_on": ["s1"], "foreach": "s1.suppliers"}}.
+- At most {max_steps} steps. If no skill is needed, return {{"steps": []}}.
+"""
+
+SYNTHESIS_PROMPT = """You are a smart Orchestrator Agent for a supply chain system.
+Answer the user's question using only the skill results below. Be complete and specific.
+
+Question: {question}
+
+Skill results (JSON):
+{results}
+"""
+
+def _resolve_path(value: Any, path: List[str]) -> Any:
+    for key in path:
+        if isinstance(value, dict):
+            value = value.get(key)
+        elif isinstance(value, list) and key.isdigit() and int(key) < len(value):
+            value = value[int(key)]
+        else:
+            return None
+    return value
+
+def _substitute(value: Any, scope: Dict[str, Any]) -> Any:
+    if isinstance(value, dict):
+        return {k: _substitute(v, scope) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_substitute(v, scope) for v in value]
+    if not isinstance(value, str):
+        return value
+
+    whole = REFERENCE.fullmatch(value)
+    if whole and whole.group(1) in scope:
+        # A bare reference keeps the referenced value's type (list, int, ...)
+        return _resolve_path(scope[whole.group(1)], [p for p in whole.group(2).split(".") if p])
+
+    def replace(match):
+        if match.group(1) not in scope:
+            return match.group(0)
+        resolved = _resolve_path(scope[match.group(1)], [p for p in match.group(2).split(".") if p])
+        return "" if resolved is None else str(resolved)
+    return REFERENCE.sub(replace, value)
+
+def validate_plan(plan: Plan) -> Dict[str, Any]:
+    """Checks skills, dependencies and acyclicity. Returns skill id -> (agent, skill)."""
+    skills = {}
+    for agent in list(registry.agents.values()):
+        for skill in agent.skills:
+            skills[skill.id] = (agent, skill)
+
+    if len(plan.steps) > MAX_PLAN_STEPS:
+        raise PlanError(f"Plan has {len(plan.steps)} steps (max {MAX_PLAN_STEPS})")
+    ids = [step.id for step in plan.steps]
+    if len(set(ids)) != len(ids):
+        raise PlanError("Duplicate step ids in plan")
+    for step in plan.steps:
+        if step.skill not in skills:
+            raise PlanError(f"Unknown skill '{step.skill}' in step {step.id}")
+        for dep in step.depends_on:
+            if dep not in ids:
+                raise PlanError(f"Step {step.id} depends on unknown step '{dep}'")
+        if step.foreach and step.foreach.split(".")[0] not in step.depends_on:
+            raise PlanError(f"Step {step.id} iterates over a step it does not depend on")
+
+    # Kahn's algorithm: every step must be reachable without cycles
+    remaining = {step.id: set(step.depends_on) for step in plan.steps}
+    while remaining:
+        ready = [sid for sid, deps in remaining.items() if not deps]
+        if not ready:
+            raise PlanError("Plan contains a dependency cycle")
+        for sid in ready:
+            del remaining[sid]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+    return skills
+
+async def make_plan(question: str) -> Plan:
+    """The single planning LLM call."""
+    prompt = PLANNER_PROMPT.format(skills=_skills_catalog(), max_steps=MAX_PLAN_STEPS)
+    llm = get_llm().bind(response_format={"type": "json_object"})
+    response = await llm.ainvoke(
+        [("system", prompt), ("user", question)],
+        config={"callbacks": get_langfuse_callbacks(), "run_name": "plan"}
+    )
+    try:
+        return Plan(**json.loads(response.content))
+    except (json.JSONDecodeError, ValidationError, TypeError) as e:
+        raise PlanError(f"Planner returned an invalid plan: {e}")
+
+def _event(component: AGUIComponent) -> str:
+    return json.dumps({"type": "component", "component": component.model_dump()}) + "\n"
+
+async def execute_plan(plan: Plan, max_concurrency: Optional[int] = None, component_types: Optional[Dict[str, AGUIComponentType]] = None):
+    """
+    Runs every step as soon as its dependencies finish, streaming AG-UI
+    progress components as steps start and complete. Yields NDJSON lines;
+    the final item is ("results", {step_id: output}).
+    """
+    skills = validate_plan(plan)
+    component_types = component_types or {}
+    semaphore = asyncio.Semaphore(max(1, max_concurrency or DEFAULT_PLAN_CONCURRENCY))
+    queue: asyncio.Queue = asyncio.Queue()
+    results: Dict[str, Any] = {}
+    done: Dict[str, asyncio.Event] = {step.id: asyncio.Event() for step in plan.steps}
+
+    async def call(step: PlanStep, args: Dict[str, Any], call_id: str):
+        agent, skill = skills[step.skill]
+        await queue.put(_event(AGUIComponent(
+            type=AGUIComponentType.JSON,
+            title=f"Executing: {step.skill}",
+            data={"input": args, "status": "started", "step": step.id},
+            id=call_id
+        )))
+        async def fetch():
+            async with semaphore:
+                return await client_pool.post(agent.url, step.skill, args, timeout=skill.timeout_seconds)
+
+        try:
+            output = await tool_cache.call(agent, skill, args, fetch)
+            status = "completed"
+        except Exception as e:
+            output = f"Error calling {step.skill}: {e}"
+            status = "error"
+        await queue.put(_event(AGUIComponent(
+            type=component_types.get(step.skill, AGUIComponentType.JSON) if status == "completed" else AGUIComponentType.JSON,
+            title=f"Completed: {step.skill}",
+            data={"output": output, "status": status, "step": step.id},
+            id=call_id
+        )))
+        return output
+
+    async def run(step: PlanStep):
+        try:
+            for dep in step.depends_on:
+                await done[dep].wait()
+            scope = {dep: results.get(dep) for dep in step.depends_on}
+            if step.foreach:
+                source, *path = step.foreach.split(".")
+                items = _resolve_path(results.get(source), path)
+                items = items if isinstance(items, list) else []
+                items = items[:MAX_FOREACH_ITEMS]
+                results[step.id] = list(await asyncio.gather(*(
+                    call(step, _substitute(step.args, {**scope, "item": item}), f"{step.id}-{i}")
+                    for i, item in enumerate(items)
+                )))
+            else:
+                results[step.id] = await call(step, _substitute(step.args, scope), step.id)
+        finally:
+            done[step.id].set()
+
+    tasks = [asyncio.create_task(run(step)) for step in plan.steps]
+    runner = asyncio.ensure_future(asyncio.gather(*tasks))
+    try:
+        while not (runner.done() and queue.empty()):
+            getter = asyncio.ensure_future(queue.get())
+            finished, _ = await asyncio.wait({getter, runner}, return_when=asyncio.FIRST_COMPLETED)
+            if getter in finished:
+                yield getter.result()
+            else:
+                getter.cancel()
+        runner.result()
+    finally:
+        for task in tasks:
+            task.cancel()
+    yield ("results", results)
+
+async def plan_and_execute_stream(question: str, max_concurrency: Optional[int] = None, component_types: Optional[Dict[str, AGUIComponentType]] = None):
+    """
+    Plan (1 LLM call) -> parallel DAG execution -> synthesis (1 LLM call), as NDJSON.
+    Raises PlanError before yielding anything if the plan is unusable.
+    """
+    plan = await make_plan(question)
+    validate_plan(plan)
+    yield _event(AGUIComponent(
+        type=AGUIComponentType.JSON,
+        title="Plan",
+        data={"steps": [step.model_dump() for step in plan.steps], "status": "planned"}
+    ))
+
+    results: Dict[str, Any] = {}
+    async for item in execute_plan(plan, max_concurrency, component_types):
+        if isinstance(item, tuple):
+            results = item[1]
+        else:
+            yield item
+
+    prompt = SYNTHESIS_PROMPT.format(question=question, results=json.dumps(results, default=str))
+    async for chunk in get_llm().astream(
+        [("user", prompt)],
+        config={"callbacks": get_langfuse_callbacks(), "run_name": "synthesize"}
+    ):
+        if chunk.content:
+            yield json.dumps({"type": "token", "content": chunk.content}) + "\n"
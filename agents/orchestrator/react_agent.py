@@ -7,14 +7,41 @@ from langfuse.langchain import CallbackHandler
 import requests
 import json
 import os
-from typing import List, Any
+import asyncio
+import contextvars
+from typing import List, Dict, Any, Optional
 
+from shared.protocol import AgentCard, AgentSkill
 from .registry import registry
+from .http_client import client_pool, DEFAULT_TOOL_TIMEOUT
+from .tool_cache import tool_cache
 
-def create_dynamic_tool(agent_url: str, tool_name: str, description: str, parameters: dict):
+# AgentExecutor's async path gathers every tool call the LLM emits in one step,
+# so independent calls already fan out. This caps how many run at once for a
+# single chat request; each /chat stream sets its own semaphore.
+DEFAULT_TOOL_CONCURRENCY = int(os.getenv("TOOL_FANOUT_CONCURRENCY", "4"))
+_tool_semaphore: contextvars.ContextVar[Optional[asyncio.Semaphore]] = contextvars.ContextVar(
+    "tool_semaphore", default=None
+)
+
+def set_tool_concurrency(limit: Optional[int] = None):
+    """
+    Sets the per-request cap on concurrently executing tool calls.
+    Must be called from the task that drives astream_events.
+    """
+    limit = limit or DEFAULT_TOOL_CONCURRENCY
+    return _tool_semaphore.set(asyncio.Semaphore(max(1, limit)))
+
+def create_dynamic_tool(agent_url: str, tool_name: str, description: str, parameters: dict, timeout: Optional[float] = None,
+                        agent: Optional[AgentCard] = None, skill: Optional[AgentSkill] = None):
     """
     Creates a LangChain tool that forwards calls to the remote agent.
+    The async path (used by astream_events) goes through the shared
+    connection pool so a slow agent never blocks the event loop, and
+    through the tool result cache when `agent` and `skill` are given.
     """
+    timeout = timeout or DEFAULT_TOOL_TIMEOUT
+
     # 1. Create Pydantic model for args dynamically
     fields = {}
     for param_name, param_info in parameters.get("properties", {}).items():
@@ -22,6 +49,14 @@ def create_dynamic_tool(agent_url: str, tool_name: str, description: str, parame
         field_type = str
         if param_info.get("type") == "integer":
             field_type = int
+        elif param_info.get("type") == "array":
+            item_type = param_info.get("items", {}).get("type")
+            if item_type == "integer":
+                field_type = List[int]
+            elif item_type == "object":
+                field_type = List[Dict[str, Any]]
+            else:
+                field_type = List[str]
         fields[param_name] = (field_type, Field(description=param_info.get("description", "")))
     
     ArgsModel = create_model(f"{tool_name}Args", **fields)
@@ -30,23 +65,73 @@ def create_dynamic_tool(agent_url: str, tool_name: str, description: str, parame
     def func(**kwargs):
         endpoint = f"{agent_url}/{tool_name}"
         try:
-            response = requests.post(endpoint, json=kwargs)
+            response = requests.post(endpoint, json=kwargs, timeout=timeout)
             response.raise_for_status()
             return response.json()
         except Exception as e:
             return f"Error calling {tool_name}: {e}"
 
+    async def fetch(kwargs):
+        semaphore = _tool_semaphore.get()
+        if semaphore is None:
+            return await client_pool.post(agent_url, tool_name, kwargs, timeout=timeout)
+        async with semaphore:
+            return await client_pool.post(agent_url, tool_name, kwargs, timeout=timeout)
+
+    async def coroutine(**kwargs):
+        try:
+            if agent is None or skill is None:
+                return await fetch(kwargs)
+            # Cache hits return without taking a concurrency slot
+            return await tool_cache.call(agent, skill, kwargs, lambda: fetch(kwargs))
+        except Exception as e:
+            return f"Error calling {tool_name}: {e}"
+
     return StructuredTool.from_function(
         func=func,
+        coroutine=coroutine,
         name=tool_name,
         description=description,
         args_schema=ArgsModel
     )
 
+def get_langfuse_callbacks() -> list:
+    """Langfuse LangChain callback handler, if tracing is enabled and available."""
+    if os.getenv("LANGFUSE_ENABLED", "true").lower() != "true":
+        return []
+    try:
+        return [CallbackHandler(
+            secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
+            public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
+            host=os.getenv("LANGFUSE_HOST"),
+        )]
+    except Exception as e:
+        print(f"Warning: Could not initialize Langfuse: {e}")
+        return []
+
+# Compiled executor cache, keyed on the registry generation it was built from.
+_cached_executor = None
+_cached_generation = -1
+
 def get_react_agent():
+    """
+    Returns the ReAct agent for the current registry state.
+    The executor is rebuilt only when an agent registers or deregisters.
+    """
+    global _cached_executor, _cached_generation
+    generation = registry.generation
+    if _cached_generation != generation:
+        _cached_executor = build_react_agent()
+        _cached_generation = generation
+    return _cached_executor
+
+def build_react_agent():
     """
     Dynamically constructs a ReAct agent using registered tools and their instructions.
     """
+    if not registry.agents:
+        return None
+
     tools = []
     
     # Build tools from registry
@@ -56,7 +141,10 @@ def get_react_agent():
                 agent_url=agent.url,
                 tool_name=skill.id,
                 description=skill.description,
-                parameters=skill.parameters
+                parameters=skill.parameters,
+                timeout=skill.timeout_seconds,
+                agent=agent,
+                skill=skill
             )
             tools.append(tool)
     
@@ -88,20 +176,8 @@ Provide a complete answer based on the user's specific request.
     llm = ChatOpenAI(model="gpt-4o-mini", temperature=0)
     agent = create_openai_tools_agent(llm, tools, prompt)
     
-    # Initialize Langfuse callback handler
-    langfuse_handler = None
-    if os.getenv("LANGFUSE_ENABLED", "true").lower() == "true":
-        try:
-            langfuse_handler = CallbackHandler(
-                secret_key=os.getenv("LANGFUSE_SECRET_KEY"),
-                public_key=os.getenv("LANGFUSE_PUBLIC_KEY"),
-                host=os.getenv("LANGFUSE_HOST"),
-            )
-        except Exception as e:
-            print(f"Warning: Could not initialize Langfuse: {e}")
-    
     # Create executor with Langfuse callback
-    callbacks = [langfuse_handler] if langfuse_handler else []
+    callbacks = get_langfuse_callbacks()
     agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True, callbacks=callbacks)
     
     return agent_executor
@@ -1,14 +1,44 @@
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Callable
+import threading
 from shared.protocol import AgentCard, AgentSkill
 
 class Registry:
     def __init__(self):
         self.agents: Dict[str, AgentCard] = {}
+        # Bumped on every register/deregister so consumers (e.g. the cached
+        # ReAct executor) can tell when their view of the tools is stale.
+        self.generation: int = 0
+        self._lock = threading.Lock()
+        # Called with the agent name whenever that agent registers or deregisters
+        self._listeners: List[Callable[[str], None]] = []
+
+    def add_listener(self, listener: Callable[[str], None]):
+        self._listeners.append(listener)
+
+    def _notify(self, agent_name: str):
+        for listener in self._listeners:
+            try:
+                listener(agent_name)
+            except Exception as e:
+                print(f"Registry listener failed for {agent_name}: {e}")
 
     def register_agent(self, agent: AgentCard):
-        self.agents[agent.name] = agent
+        with self._lock:
+            self.agents[agent.name] = agent
+            self.generation += 1
+        self._notify(agent.name)
         print(f"Registered agent: {agent.name} with skills: {[s.name for s in agent.skills]}")
 
+    def deregister_agent(self, agent_name: str) -> bool:
+        with self._lock:
+            if agent_name not in self.agents:
+                return False
+            del self.agents[agent_name]
+            self.generation += 1
+        self._notify(agent_name)
+        print(f"Deregistered agent: {agent_name}")
+        return True
+
     def get_all_skills(self) -> List[AgentSkill]:
         skills = []
         for agent in self.agents.values():
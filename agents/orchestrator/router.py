@@ -0,0 +1,154 @@
+import os
+import re
+import time
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from shared.protocol import AgentCard, AgentSkill
+from .registry import registry
+from .http_client import client_pool
+
+FAST_PATH_ENABLED = os.getenv("ORCHESTRATOR_FAST_PATH", "true").lower() == "true"
+ENTITY_REFRESH_SECONDS = float(os.getenv("FAST_PATH_ENTITY_REFRESH_SECONDS", "300"))
+MAX_MESSAGE_LENGTH = int(os.getenv("FAST_PATH_MAX_MESSAGE_LENGTH", "200"))
+
+# Multi-entity or open-ended phrasing: a single direct call would answer only part of it
+COMPOUND_REQUEST = re.compile(r"\b(and|or|versus|vs\.?|compare|comparison|between|both|each|all|every|why|how|impact|should)\b", re.IGNORECASE)
+
+TOKEN = re.compile(r"\w+")
+
+class EntityIndex:
+    """
+    Token index over an entity list, built once per entity refresh.
+
+    A whole-word mention of a name implies every word token of the name is
+    also a token of the message, so each entity is indexed under its rarest
+    token only. Matching a message touches just the entities filed under
+    the message's own tokens instead of scanning all of them.
+    """
+
+    def __init__(self, entities: List[Dict[str, Any]]):
+        self.size = len(entities)
+        self._by_token: Dict[str, List[Dict[str, Any]]] = {}
+        self._untokenized: List[Dict[str, Any]] = []
+
+        tokenized = []
+        frequency: Dict[str, int] = {}
+        for entity in entities:
+            if not entity.get("match"):
+                continue
+            tokens = set(TOKEN.findall(entity["match"].lower()))
+            tokenized.append((entity, tokens))
+            for token in tokens:
+                frequency[token] = frequency.get(token, 0) + 1
+
+        for entity, tokens in tokenized:
+            if tokens:
+                rarest = min(tokens, key=lambda t: (frequency[t], -len(t)))
+                self._by_token.setdefault(rarest, []).append(entity)
+            else:
+                self._untokenized.append(entity)
+
+    def candidates(self, message: str) -> List[Dict[str, Any]]:
+        found = list(self._untokenized)
+        for token in set(TOKEN.findall(message)):
+            found.extend(self._by_token.get(token, ()))
+        # Cheap substring pre-filter before any regex
+        return [e for e in found if e["match"].lower() in message]
+
+class RouteMatch:
+    def __init__(self, agent: AgentCard, skill: AgentSkill, entity: str, args: Dict[str, Any]):
+        self.agent = agent
+        self.skill = skill
+        self.entity = entity
+        self.args = args
+
+class FastPathRouter:
+    """
+    Deterministic pre-routing ahead of the ReAct agent.
+
+    A request is routed directly only when exactly one skill's route triggers
+    match the message and exactly one known entity (e.g. a part in Neo4j or a
+    supplier in Postgres) is named in it. Anything ambiguous returns None and
+    falls through to the LLM.
+    """
+
+    def __init__(self):
+        # skill id -> (loaded_at, generation, EntityIndex)
+        self._entities: Dict[str, tuple] = {}
+        self._lock = asyncio.Lock()
+        self.routed = 0
+        self.fallthrough = 0
+
+    async def _get_entities(self, agent: AgentCard, skill: AgentSkill) -> EntityIndex:
+        cached = self._entities.get(skill.id)
+        if cached and cached[1] == registry.generation and time.monotonic() - cached[0] < ENTITY_REFRESH_SECONDS:
+            return cached[2]
+        async with self._lock:
+            cached = self._entities.get(skill.id)
+            if cached and cached[1] == registry.generation and time.monotonic() - cached[0] < ENTITY_REFRESH_SECONDS:
+                return cached[2]
+            try:
+                entities = await client_pool.get_json(agent.url, skill.route.entity_source)
+                # Indexing tens of thousands of names must not stall other streams
+                index = await asyncio.to_thread(EntityIndex, entities)
+            except Exception as e:
+                print(f"Fast path: could not load entities for {skill.id}: {e}")
+                index = cached[2] if cached else EntityIndex([])
+            self._entities[skill.id] = (time.monotonic(), registry.generation, index)
+            return index
+
+    @staticmethod
+    def _mentions(message: str, text: str) -> bool:
+        return re.search(r"(?<!\w)" + re.escape(text.lower()) + r"(?!\w)", message) is not None
+
+    def _match_entity(self, message: str, index: EntityIndex) -> Optional[Dict[str, Any]]:
+        matches = [e for e in index.candidates(message) if self._mentions(message, e["match"])]
+        if not matches:
+            return None
+        # Drop names that are only matched as part of a longer name ("V6 Engine" inside "3.5L V6 Engine")
+        names = {m["match"].lower() for m in matches}
+        matches = [m for m in matches if not any(m["match"].lower() != n and m["match"].lower() in n for n in names)]
+        if len({m["match"].lower() for m in matches}) != 1:
+            return None
+        # Every stored arg must be named in the message too: "risk for Bosch in China"
+        # must not become analyze-risk(Bosch, Germany). Also picks between records
+        # sharing a name (e.g. a supplier in two countries).
+        matches = [m for m in matches if all(self._mentions(message, str(v)) for v in m["args"].values())]
+        if len(matches) != 1:
+            return None
+        return matches[0]
+
+    async def route(self, message: str) -> Optional[RouteMatch]:
+        if not FAST_PATH_ENABLED or len(message) > MAX_MESSAGE_LENGTH or COMPOUND_REQUEST.search(message):
+            self.fallthrough += 1
+            return None
+        text = message.lower()
+
+        candidates = []
+        for agent in list(registry.agents.values()):
+            for skill in agent.skills:
+                if skill.route and any(re.search(t, text, re.IGNORECASE) for t in skill.route.triggers):
+                    candidates.append((agent, skill))
+        if len(candidates) != 1:
+            self.fallthrough += 1
+            return None
+
+        agent, skill = candidates[0]
+        entity = self._match_entity(text, await self._get_entities(agent, skill))
+        if entity is None:
+            self.fallthrough += 1
+            return None
+
+        self.routed += 1
+        return RouteMatch(agent, skill, entity["match"], entity["args"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": FAST_PATH_ENABLED,
+            "routed": self.routed,
+            "fallthrough": self.fallthrough,
+            "entity_sources": {k: v[2].size for k, v in self._entities.items()},
+        }
+
+fast_path_router = FastPathRouter()
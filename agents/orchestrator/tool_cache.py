@@ -0,0 +1,173 @@
+"""
+Orchestrator-level cache of tool results.
+
+Entries are keyed by (skill id, canonicalized args) and only stored for
+skills whose CacheHint (on the skill, or else on its agent card) marks them
+cacheable, and only if the result isn't flagged by the hint's skip_if
+fields (e.g. a stale answer that is being recomputed). The hint's TTL
+bounds each entry's lifetime and its cost decides what goes first when
+the cache is full. Every entry of an agent is dropped
+when that agent re-registers or deregisters, since its skills, data or
+code may have changed.
+"""
+import os
+import json
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from shared.protocol import AgentCard, AgentSkill, CacheHint
+from .registry import registry
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "2048"))
+TOOL_CACHE_DEFAULT_TTL = float(os.getenv("TOOL_CACHE_DEFAULT_TTL_SECONDS", "300"))
+# When full, the cheapest of this many least-recently-used entries is evicted
+EVICTION_SAMPLE = int(os.getenv("TOOL_CACHE_EVICTION_SAMPLE", "8"))
+
+def canonicalize_args(args: Dict[str, Any]) -> str:
+    """Stable key for a set of arguments: sorted keys, trimmed strings, no None values."""
+    def clean(value):
+        if isinstance(value, dict):
+            return {k: clean(v) for k, v in value.items() if v is not None}
+        if isinstance(value, list):
+            return [clean(v) for v in value]
+        if isinstance(value, str):
+            return value.strip()
+        return value
+    return json.dumps(clean(args), sort_keys=True, separators=(",", ":"), default=str)
+
+def cache_hint(agent: AgentCard, skill: AgentSkill) -> Optional[CacheHint]:
+    hint = skill.cache or agent.cache
+    return hint if hint and hint.cacheable else None
+
+def is_storable(hint: CacheHint, value: Any) -> bool:
+    """False if the result is flagged by one of the hint's skip_if fields (e.g. a stale answer)."""
+    if not hint.skip_if:
+        return True
+    items = value if isinstance(value, list) else [value]
+    return not any(
+        isinstance(item, dict) and any(item.get(flag) for flag in hint.skip_if)
+        for item in items
+    )
+
+class ToolResultCache:
+    def __init__(self, max_entries: int = TOOL_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        # (skill id, args key) -> (expires_at, cost, agent name, value)
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        # Identical concurrent misses share one upstream call (a task of its own)
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._skill_stats: Dict[str, Dict[str, int]] = {}
+        self.evictions = 0
+        self.invalidations = 0
+        # Registry listeners run on the threadpool (sync /register handlers)
+        self._lock = threading.Lock()
+
+    def _count(self, skill_id: str, outcome: str):
+        stats = self._skill_stats.setdefault(skill_id, {"hits": 0, "misses": 0})
+        stats[outcome] += 1
+
+    def _get(self, key: Tuple[str, str]):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return False, None
+            self._entries.move_to_end(key)
+            return True, entry[3]
+
+    def _put(self, key: Tuple[str, str], hint: CacheHint, agent_name: str, value: Any):
+        ttl = hint.ttl_seconds if hint.ttl_seconds is not None else TOOL_CACHE_DEFAULT_TTL
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, hint.cost, agent_name, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                now = time.monotonic()
+                expired = [k for k, e in self._entries.items() if e[0] < now]
+                if expired:
+                    for k in expired:
+                        del self._entries[k]
+                    continue
+                oldest = [k for k, _ in zip(self._entries, range(EVICTION_SAMPLE))]
+                victim = min(oldest, key=lambda k: self._entries[k][1])
+                del self._entries[victim]
+                self.evictions += 1
+
+    async def call(self, agent: AgentCard, skill: AgentSkill, args: Dict[str, Any],
+                   fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Returns a cached result for (skill, args) or awaits `fetch()` and caches it."""
+        hint = cache_hint(agent, skill)
+        if not TOOL_CACHE_ENABLED or hint is None:
+            return await fetch()
+
+        key = (skill.id, canonicalize_args(args))
+        found, value = self._get(key)
+        if found:
+            self._count(skill.id, "hits")
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._count(skill.id, "hits")
+        else:
+            self._count(skill.id, "misses")
+            # The shared fetch runs as its own task, so one caller being cancelled
+            # (e.g. a client disconnect) doesn't cancel it for the other waiters
+            task = asyncio.ensure_future(self._fetch_and_store(key, hint, agent.name, fetch))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+        return await asyncio.shield(task)
+
+    async def _fetch_and_store(self, key: Tuple[str, str], hint: CacheHint, agent_name: str,
+                               fetch: Callable[[], Awaitable[Any]]) -> Any:
+        generation = registry.generation
+        value = await fetch()
+        # Skip results fetched across a re-registration: they may predate it
+        if generation == registry.generation and is_storable(hint, value):
+            self._put(key, hint, agent_name, value)
+        return value
+
+    def _fetch_done(self, key: Tuple[str, str], task: asyncio.Future):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every waiter has gone away
+
+    def evict_agent(self, agent_name: str):
+        with self._lock:
+            stale = [k for k, e in self._entries.items() if e[2] == agent_name]
+            for k in stale:
+                del self._entries[k]
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        hits = sum(s["hits"] for s in self._skill_stats.values())
+        misses = sum(s["misses"] for s in self._skill_stats.values())
+        return {
+            "enabled": TOOL_CACHE_ENABLED,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "skills": {
+                skill_id: {**s, "hit_rate": round(s["hits"] / (s["hits"] + s["misses"]), 3)}
+                for skill_id, s in self._skill_stats.items() if s["hits"] + s["misses"]
+            },
+        }
+
+tool_cache = ToolResultCache()
+registry.add_listener(tool_cache.evict_agent)
@@ -0,0 +1,52 @@
+"""
+Bulk loader for supplier and material master data.
+
+Reads CSV or JSONL files and upserts them with bulk_upsert (batched Core
+executemany with ON CONFLICT on the natural key), so re-running a load is
+safe. Columns must match the Supplier / Material model fields.
+
+Usage:
+    python -m agent.bulk_load suppliers data/suppliers.csv [--update-existing]
+    python -m agent.bulk_load materials data/materials.jsonl [--batch-size 10000]
+"""
+import csv
+import json
+import argparse
+from typing import Any, Dict, List
+
+from .database import Supplier, Material, bulk_upsert, init_db, BULK_BATCH_SIZE
+
+MODELS = {"suppliers": Supplier, "materials": Material}
+
+# CSV values arrive as strings; coerce the numeric columns
+NUMERIC_COLUMNS = {"risk_score": int, "average_price_usd": float}
+
+def read_rows(path: str) -> List[Dict[str, Any]]:
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    rows = []
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        for row in csv.DictReader(f):
+            for column, cast in NUMERIC_COLUMNS.items():
+                if column in row:
+                    row[column] = cast(row[column]) if row[column] not in ("", None) else None
+            rows.append(row)
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load supplier/material master data")
+    parser.add_argument("table", choices=sorted(MODELS))
+    parser.add_argument("paths", nargs="+", help="CSV or JSONL files")
+    parser.add_argument("--batch-size", type=int, default=BULK_BATCH_SIZE)
+    parser.add_argument("--update-existing", action="store_true", help="Overwrite rows that already exist instead of skipping them")
+    args = parser.parse_args()
+
+    init_db()
+    rows = [row for path in args.paths for row in read_rows(path)]
+    stats = bulk_upsert(MODELS[args.table], rows, update_existing=args.update_existing, batch_size=args.batch_size)
+    print(json.dumps(stats, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,43 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import FastAPI, BackgroundTasks
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select, tuple_
 from pydantic import BaseModel
+from typing import List, Optional
 import uvicorn
 import os
+import json
+import asyncio
+import threading
 from datetime import datetime
 
-from .database import Base, engine, get_db, Supplier, init_db
-from .rag import generate_pestel_analysis
+from .database import (
+    Supplier, init_db, AsyncSessionLocal, async_engine,
+    aupsert_supplier_analyses, pool_stats
+)
+from .rag import agenerate_pestel_analysis, warm_country_cache, close_http_client, PESTEL_TTL
+from .singleflight import AsyncSingleFlight
 from shared.utils import register_agent
+from shared.langfuse_config import get_langfuse_client, shutdown_langfuse
 
 app = FastAPI(title="Supplier Risk Agent")
 
+# One in-progress PESTEL computation per (supplier, country); concurrent requests share it
+pestel_flight = AsyncSingleFlight()
+
+# Max PESTEL computations a single analyze-risk-batch request runs at once
+BATCH_CONCURRENCY = int(os.getenv("RISK_BATCH_CONCURRENCY", "4"))
+# How long the orchestrator may reuse a risk result (shorter than PESTEL_TTL so refreshes show up)
+RISK_RESULT_CACHE_TTL = float(os.getenv("RISK_RESULT_CACHE_TTL_SECONDS", "3600"))
+
 # Initialize DB on startup
 @app.on_event("startup")
 def on_startup():
+    get_langfuse_client()
     init_db()
+
+    # Optionally preload World Bank/WTO indicators for all known countries
+    if os.getenv("WARM_COUNTRY_CACHE", "false").lower() == "true":
+        threading.Thread(target=warm_country_cache, daemon=True).start()
     
     # Register with Orchestrator using Agent Card Skills
     skills = [
@@ -31,10 +54,52 @@ def on_startup():
                     "country": {"type": "string", "description": "Country of the supplier"}
                 },
                 "required": ["supplier_name", "country"]
+            },
+            "route": {
+                "triggers": [r"\brisks?\b", r"\bpestel\b"],
+                "entity_source": "/entities"
             }
+        },
+        {
+            "id": "analyze-risk-batch",
+            "name": "Analyze Supplier Risk (Batch)",
+            "description": "Analyzes PESTEL risk for many (supplier, country) pairs in one call. Known suppliers are served from cache; the rest are computed concurrently.",
+            "inputModes": ["text"],
+            "outputModes": ["json"],
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "suppliers": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "supplier_name": {"type": "string"},
+                                "country": {"type": "string"}
+                            }
+                        },
+                        "description": "List of {supplier_name, country} objects"
+                    }
+                },
+                "required": ["suppliers"]
+            },
+            "instructions": "Use analyze-risk-batch instead of repeated analyze-risk calls when comparing or scoring several suppliers at once."
         }
     ]
-    register_agent("supplier-agent", 8001, skills)
+    # Risk analyses call an LLM, so they are expensive to recompute. Stale answers
+    # (being refreshed in the background) and fallback scores must not be reused.
+    register_agent("supplier-agent", 8001, skills, cache={
+        "cacheable": True,
+        "ttl_seconds": RISK_RESULT_CACHE_TTL,
+        "cost": 10.0,
+        "skip_if": ["stale", "fallback", "error"]
+    })
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_http_client()
+    await async_engine.dispose()
+    shutdown_langfuse()
 
 @app.get("/.well-known/agent.json")
 def get_agent_card():
@@ -47,6 +112,10 @@ def get_agent_card():
             {
                 "id": "analyze-risk",
                 "name": "Analyze Supplier Risk"
+            },
+            {
+                "id": "analyze-risk-batch",
+                "name": "Analyze Supplier Risk (Batch)"
             }
         ]
     }
@@ -62,55 +131,151 @@ class RiskResponse(BaseModel):
     risk_score: int
     summary: str
     pestel_data: dict
+    last_updated: Optional[datetime] = None
+    stale: bool = False
+    # True when the LLM failed and this is the neutral default score
+    fallback: bool = False
 
-@app.post("/analyze-risk", response_model=RiskResponse)
-def analyze_risk(request: RiskRequest, db: Session = Depends(get_db)):
-    # Check cache
-    supplier = db.query(Supplier).filter(
-        Supplier.name == request.supplier_name, 
-        Supplier.country == request.country
-    ).first()
-    
-    if supplier and supplier.pestel_data:
-        return RiskResponse(
-            supplier_name=supplier.name,
-            country=supplier.country,
-            risk_score=supplier.risk_score,
-            summary=supplier.pestel_data.get("summary", ""),
-            pestel_data=supplier.pestel_data.get("pestel_breakdown", {})
-        )
-    
-    # Generate new analysis
-    analysis = generate_pestel_analysis(request.supplier_name, request.country)
-    
-    # Save to DB
-    if not supplier:
-        supplier = Supplier(
-            name=request.supplier_name,
-            country=request.country,
-            risk_score=analysis.get("risk_score", 50),
-            pestel_data=analysis
-        )
-        db.add(supplier)
-    else:
-        supplier.risk_score = analysis.get("risk_score", 50)
-        supplier.pestel_data = analysis
-        supplier.last_updated = datetime.utcnow()
-        
-    db.commit()
-    db.refresh(supplier)
-    
+def is_fresh(supplier: Supplier) -> bool:
+    if supplier.pestel_data and supplier.pestel_data.get("fallback"):
+        return False
+    return supplier.last_updated is not None and datetime.utcnow() - supplier.last_updated < PESTEL_TTL
+
+def to_response(supplier: Supplier, stale: bool = False) -> RiskResponse:
     return RiskResponse(
         supplier_name=supplier.name,
         country=supplier.country,
         risk_score=supplier.risk_score,
-        summary=analysis.get("summary", ""),
-        pestel_data=analysis.get("pestel_breakdown", {})
+        summary=supplier.pestel_data.get("summary", ""),
+        pestel_data=supplier.pestel_data.get("pestel_breakdown", {}),
+        last_updated=supplier.last_updated,
+        stale=stale,
+        fallback=bool(supplier.pestel_data.get("fallback"))
     )
 
+async def find_supplier(supplier_name: str, country: str) -> Optional[Supplier]:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(Supplier).where(
+                Supplier.name == supplier_name,
+                Supplier.country == country
+            )
+        )
+
+async def store_analysis(supplier_name: str, country: str, analysis: dict) -> RiskResponse:
+    # Single native upsert: no read-then-write race between concurrent workers
+    async with AsyncSessionLocal() as db:
+        supplier = (await aupsert_supplier_analyses(db, [{
+            "name": supplier_name,
+            "country": country,
+            "risk_score": analysis.get("risk_score", 50),
+            "pestel_data": analysis,
+            "last_updated": datetime.utcnow()
+        }]))[0]
+        response = to_response(supplier)
+        await db.commit()
+        return response
+
+async def _compute_and_save(supplier_name: str, country: str) -> RiskResponse:
+    # Runs once per in-flight key, so it uses its own session rather than a caller's
+    analysis = await agenerate_pestel_analysis(supplier_name, country)
+    return await store_analysis(supplier_name, country, analysis)
+
+async def compute_analysis(supplier_name: str, country: str) -> RiskResponse:
+    """Computes and stores a PESTEL analysis, coalescing concurrent identical requests."""
+    return await pestel_flight.do(
+        (supplier_name, country),
+        lambda: _compute_and_save(supplier_name, country)
+    )
+
+async def refresh_analysis(supplier_name: str, country: str):
+    """Background task: recompute a stale PESTEL analysis."""
+    if pestel_flight.in_flight((supplier_name, country)):
+        return
+    try:
+        await compute_analysis(supplier_name, country)
+    except Exception as e:
+        print(f"Background PESTEL refresh failed for {supplier_name} ({country}): {e}")
+
+@app.post("/analyze-risk", response_model=RiskResponse)
+async def analyze_risk(request: RiskRequest, background_tasks: BackgroundTasks):
+    # Check cache
+    supplier = await find_supplier(request.supplier_name, request.country)
+    
+    if supplier and supplier.pestel_data:
+        if is_fresh(supplier):
+            return to_response(supplier)
+        # Stale-while-revalidate: answer now, recompute after the response is sent
+        background_tasks.add_task(refresh_analysis, request.supplier_name, request.country)
+        return to_response(supplier, stale=True)
+    
+    # Generate new analysis (shared with any identical request already computing it)
+    return await compute_analysis(request.supplier_name, request.country)
+
+@app.get("/entities")
+async def list_entities():
+    """Known suppliers for the orchestrator's fast-path router, as analyze-risk arguments."""
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(select(Supplier.name, Supplier.country))).all()
+    return [
+        {"match": name, "args": {"supplier_name": name, "country": country}}
+        for name, country in rows
+    ]
+
+class RiskBatchRequest(BaseModel):
+    suppliers: List[RiskRequest]
+    max_concurrency: Optional[int] = None
+
+@app.post("/analyze-risk-batch")
+async def analyze_risk_batch(request: RiskBatchRequest, background_tasks: BackgroundTasks):
+    """
+    Scores many (supplier, country) pairs. Cached rows come back from one SQL
+    query; misses are computed concurrently under a limit. Results stream as
+    NDJSON, one RiskResponse (or error) per line, in completion order.
+    """
+    pairs = list(dict.fromkeys((r.supplier_name, r.country) for r in request.suppliers))
+
+    cached = {}
+    if pairs:
+        async with AsyncSessionLocal() as db:
+            rows = await db.scalars(
+                select(Supplier).where(tuple_(Supplier.name, Supplier.country).in_(pairs))
+            )
+            cached = {(s.name, s.country): s for s in rows if s.pestel_data}
+    semaphore = asyncio.Semaphore(max(1, request.max_concurrency or BATCH_CONCURRENCY))
+
+    async def compute(name: str, country: str) -> dict:
+        async with semaphore:
+            try:
+                result = await compute_analysis(name, country)
+                return result.model_dump(mode="json")
+            except Exception as e:
+                return {"supplier_name": name, "country": country, "error": str(e)}
+
+    async def stream():
+        misses = []
+        for name, country in pairs:
+            supplier = cached.get((name, country))
+            if supplier is None:
+                misses.append((name, country))
+                continue
+            stale = not is_fresh(supplier)
+            if stale:
+                background_tasks.add_task(refresh_analysis, name, country)
+            yield json.dumps(to_response(supplier, stale=stale).model_dump(mode="json")) + "\n"
+
+        for next_result in asyncio.as_completed([compute(name, country) for name, country in misses]):
+            yield json.dumps(await next_result) + "\n"
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson", background=background_tasks)
+
 @app.get("/health")
 def health():
-    return {"status": "healthy"}
+    return {
+        "status": "healthy",
+        "pestel_single_flight": pestel_flight.stats(),
+        "db_pool": pool_stats()
+    }
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8001)))
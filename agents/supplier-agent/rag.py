@@ -1,36 +1,83 @@
 import os
+import asyncio
 import requests
+import httpx
 import google.generativeai as genai
 import json
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from langfuse import get_client
 
+from .database import SessionLocal, CountryIndicator
+
 # Configure Gemini
 genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
 
+# Map country name to ISO code (simplified)
+COUNTRY_CODES = {"Germany": "DE", "Japan": "JP", "USA": "US", "China": "CN", "India": "IN", "Canada": "CA", "France": "FR", "South Korea": "KR"}
+
+WORLD_BANK_INDICATORS = ["NY.GDP.MKTP.CD", "FP.CPI.TOTL.ZG"]
+WORLD_BANK_YEAR = int(os.getenv("WORLD_BANK_YEAR", "2022"))
+HTTP_TIMEOUT = float(os.getenv("INDICATOR_HTTP_TIMEOUT", "10"))
+# Indicators are annual figures, so a long TTL is safe
+COUNTRY_CACHE_TTL = timedelta(seconds=int(os.getenv("COUNTRY_CACHE_TTL_SECONDS", str(30 * 24 * 3600))))
+# PESTEL analyses older than this are stale: served immediately, then refreshed in the background
+PESTEL_TTL = timedelta(seconds=int(os.getenv("PESTEL_TTL_SECONDS", str(7 * 24 * 3600))))
+
+def _fetch_indicator(country_code: str, indicator: str):
+    try:
+        response = requests.get(_world_bank_url(country_code, indicator), timeout=HTTP_TIMEOUT)
+        if response.status_code == 200:
+            return _parse_indicator(response.json())
+    except Exception as e:
+        print(f"Error fetching WB data for {indicator}: {e}")
+    return None
+
+def _world_bank_url(country_code: str, indicator: str) -> str:
+    return f"http://api.worldbank.org/v2/country/{country_code}/indicator/{indicator}?format=json&per_page=1&date={WORLD_BANK_YEAR}"
+
+def _parse_indicator(raw):
+    if len(raw) > 1 and raw[1]:
+        return raw[1][0].get("value")
+    return None
+
 def fetch_world_bank_data(country_code: str):
     """
     Fetches economic data from World Bank API.
     Using a public API endpoint for GDP and Inflation.
     """
     # Example: GDP (NY.GDP.MKTP.CD) and Inflation (FP.CPI.TOTL.ZG)
-    # This is a simplified implementation.
-    base_url = "http://api.worldbank.org/v2/country"
-    indicators = ["NY.GDP.MKTP.CD", "FP.CPI.TOTL.ZG"]
-    data = {}
-    
-    for indicator in indicators:
-        try:
-            url = f"{base_url}/{country_code}/indicator/{indicator}?format=json&per_page=1&date=2022"
-            response = requests.get(url)
-            if response.status_code == 200:
-                raw = response.json()
-                if len(raw) > 1 and raw[1]:
-                    data[indicator] = raw[1][0].get("value")
-        except Exception as e:
-            print(f"Error fetching WB data for {indicator}: {e}")
-            
-    return data
+    # Indicators are fetched concurrently rather than one after another.
+    with ThreadPoolExecutor(max_workers=len(WORLD_BANK_INDICATORS)) as pool:
+        values = list(pool.map(lambda ind: _fetch_indicator(country_code, ind), WORLD_BANK_INDICATORS))
+    return {ind: value for ind, value in zip(WORLD_BANK_INDICATORS, values) if value is not None}
+
+# Shared async client for the async pipeline (created lazily inside the running loop)
+_http_client: httpx.AsyncClient = None
+
+def get_http_client() -> httpx.AsyncClient:
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(timeout=HTTP_TIMEOUT)
+    return _http_client
+
+async def close_http_client():
+    if _http_client is not None:
+        await _http_client.aclose()
+
+async def _afetch_indicator(country_code: str, indicator: str):
+    try:
+        response = await get_http_client().get(_world_bank_url(country_code, indicator))
+        if response.status_code == 200:
+            return _parse_indicator(response.json())
+    except Exception as e:
+        print(f"Error fetching WB data for {indicator}: {e}")
+    return None
+
+async def afetch_world_bank_data(country_code: str):
+    """Async variant of fetch_world_bank_data; all indicators are requested concurrently."""
+    values = await asyncio.gather(*(_afetch_indicator(country_code, ind) for ind in WORLD_BANK_INDICATORS))
+    return {ind: value for ind, value in zip(WORLD_BANK_INDICATORS, values) if value is not None}
 
 def fetch_wto_data(country_name: str):
     """
@@ -47,45 +94,89 @@ def fetch_wto_data(country_name: str):
         "trade_balance": "Available in paid API"
     }
 
-def generate_pestel_analysis(supplier_name: str, country: str):
+def _load_cached_indicators(country_code: str):
+    """Returns (row_data, is_fresh) from the country_indicators table, or (None, False)."""
+    db = SessionLocal()
+    try:
+        row = db.query(CountryIndicator).filter(
+            CountryIndicator.country_code == country_code,
+            CountryIndicator.year == WORLD_BANK_YEAR
+        ).first()
+        if not row:
+            return None, False
+        fresh = row.fetched_at is not None and datetime.utcnow() - row.fetched_at < COUNTRY_CACHE_TTL
+        return (row.world_bank_data or {}, row.wto_data or {}), fresh
+    finally:
+        db.close()
+
+def _store_indicators(country_code: str, wb_data: dict, wto_data: dict):
+    db = SessionLocal()
+    try:
+        row = db.query(CountryIndicator).filter(
+            CountryIndicator.country_code == country_code,
+            CountryIndicator.year == WORLD_BANK_YEAR
+        ).first()
+        if not row:
+            row = CountryIndicator(country_code=country_code, year=WORLD_BANK_YEAR)
+            db.add(row)
+        row.world_bank_data = wb_data
+        row.wto_data = wto_data
+        row.fetched_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        # Another worker cached the same country first; their row is just as good
+        db.rollback()
+        print(f"Country indicator cache write skipped for {country_code}: {e}")
+    finally:
+        db.close()
+
+def _resolve_indicators(cached, wb_data: dict, wto_data: dict):
+    # Don't pin an empty result for the whole TTL; fall back to any older row
+    if not wb_data and cached:
+        return cached, False
+    return (wb_data, wto_data), bool(wb_data)
+
+def get_country_indicators(country: str, country_code: str):
     """
-    Generates PESTEL analysis using Gemini based on fetched data.
+    Returns (world_bank_data, wto_data) for a country, served from the
+    country_indicators table while fresh and refetched once the TTL expires.
     """
-    # Initialize Langfuse client
-    langfuse = get_client()
-    
-    # Create trace with context manager for the entire RAG pipeline
-    with langfuse.start_as_current_observation(
-        as_type="span",
-        name="pestel-analysis",
-        input={"supplier": supplier_name, "country": country},
-        metadata={"agent": "supplier", "analysis_type": "PESTEL"}
-    ) as main_span:
-        # 1. Fetch Data
-        # Map country name to ISO code (simplified)
-        country_map = {"Germany": "DE", "Japan": "JP", "USA": "US", "China": "CN", "India": "IN", "Canada": "CA", "France": "FR", "South Korea": "KR"}
-        country_code = country_map.get(country, "US") 
-        
-        # Fetch World Bank data with nested observation
-        with langfuse.start_as_current_observation(
-            as_type="span",
-            name="fetch-world-bank",
-            input={"country_code": country_code}
-        ) as wb_span:
-            wb_data = fetch_world_bank_data(country_code)
-            wb_span.update(output=wb_data)
-        
-        # Fetch WTO data
-        with langfuse.start_as_current_observation(
-            as_type="span",
-            name="fetch-wto",
-            input={"country": country}
-        ) as wto_span:
-            wto_data = fetch_wto_data(country)
-            wto_span.update(output=wto_data)
-        
-        # 2. Construct Prompt
-        prompt = f"""
+    cached, fresh = _load_cached_indicators(country_code)
+    if fresh:
+        return cached
+
+    result, store = _resolve_indicators(cached, fetch_world_bank_data(country_code), fetch_wto_data(country))
+    if store:
+        _store_indicators(country_code, *result)
+    return result
+
+async def aget_country_indicators(country: str, country_code: str):
+    """Async variant of get_country_indicators; DB access runs in worker threads."""
+    cached, fresh = await asyncio.to_thread(_load_cached_indicators, country_code)
+    if fresh:
+        return cached
+
+    result, store = _resolve_indicators(cached, await afetch_world_bank_data(country_code), fetch_wto_data(country))
+    if store:
+        await asyncio.to_thread(_store_indicators, country_code, *result)
+    return result
+
+def warm_country_cache(countries=None):
+    """Preloads indicators for every known country (default: all of COUNTRY_CODES)."""
+    countries = countries or list(COUNTRY_CODES.keys())
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(lambda c: get_country_indicators(c, COUNTRY_CODES.get(c, "US")), countries))
+    print(f"✅ Warmed country indicator cache for {len(countries)} countries")
+
+DEFAULT_PESTEL_RESULT = {
+    "risk_score": 50,
+    "summary": "Error generating analysis. Returning default neutral score.",
+    "pestel_breakdown": {},
+    "fallback": True
+}
+
+def build_pestel_prompt(supplier_name: str, country: str, wb_data: dict, wto_data: dict) -> str:
+    return f"""
         You are a Supply Chain Risk Analyst. Perform a PESTEL analysis for a supplier named '{supplier_name}' located in '{country}'.
         
         Use the following real-time economic data:
@@ -112,44 +203,55 @@ def generate_pestel_analysis(supplier_name: str, country: str):
         }}
         Do not include markdown formatting like ```json. Just return the raw JSON string.
         """
+
+def parse_pestel_response(text: str) -> dict:
+    # Clean response if needed
+    text = text.strip()
+    if text.startswith("```json"):
+        text = text[7:-3]
+    return json.loads(text)
+
+async def agenerate_pestel_analysis(supplier_name: str, country: str):
+    """
+    Async PESTEL pipeline: indicators via the shared httpx client and Gemini
+    via generate_content_async. Traces export in the background.
+    """
+    langfuse = get_client()
+    
+    with langfuse.start_as_current_observation(
+        as_type="span",
+        name="pestel-analysis",
+        input={"supplier": supplier_name, "country": country},
+        metadata={"agent": "supplier", "analysis_type": "PESTEL"}
+    ) as main_span:
+        country_code = COUNTRY_CODES.get(country, "US")
+        
+        with langfuse.start_as_current_observation(
+            as_type="span",
+            name="fetch-country-indicators",
+            input={"country": country, "country_code": country_code}
+        ) as indicators_span:
+            wb_data, wto_data = await aget_country_indicators(country, country_code)
+            indicators_span.update(output={"world_bank": wb_data, "wto": wto_data})
+        
+        prompt = build_pestel_prompt(supplier_name, country, wb_data, wto_data)
         
-        # 3. Call Gemini with generation observation
         with langfuse.start_as_current_observation(
             as_type="generation",
             name="gemini-pestel-gen",
             model="gemini-2.0-flash",
             input=[{"role": "user", "content": prompt}]
         ) as gen_span:
-            model = genai.GenerativeModel('gemini-2.0-flash')
-            response = model.generate_content(prompt)
-            
             try:
-                # Clean response if needed
-                text = response.text.strip()
-                if text.startswith("```json"):
-                    text = text[7:-3]
-                result = json.loads(text)
-                
-                # Update generation with output
+                model = genai.GenerativeModel('gemini-2.0-flash')
+                response = await model.generate_content_async(prompt)
+                result = parse_pestel_response(response.text)
                 gen_span.update(output=result)
                 main_span.update(output=result)
-                
-                # Flush Langfuse to ensure trace is sent
-                langfuse.flush()
-                
-                return result
-                
             except Exception as e:
-                print(f"Error parsing Gemini response: {e}")
-                error_result = {
-                    "risk_score": 50,
-                    "summary": "Error generating analysis. Returning default neutral score.",
-                    "pestel_breakdown": {}
-                }
-                gen_span.update(level="ERROR", status_message=str(e), output=error_result)
-                main_span.update(output=error_result)
-                
-                # Flush even on error
-                langfuse.flush()
-                
-                return error_result
+                print(f"Error generating Gemini response: {e}")
+                result = dict(DEFAULT_PESTEL_RESULT)
+                gen_span.update(level="ERROR", status_message=str(e), output=result)
+                main_span.update(output=result)
+    
+    return result
@@ -0,0 +1,120 @@
+"""
+Bulk PESTEL refresh job.
+
+Recomputes the risk analysis for every supplier with bounded parallelism and
+writes all results back in one bulk statement, so request-time analyze-risk
+calls for known suppliers are plain indexed reads of fresh rows. Each run is
+recorded in risk_refresh_runs with its duration and throughput.
+
+Intended to run nightly (cron / scheduled container):
+    python -m agent.refresh_job [--concurrency 8] [--only-stale]
+"""
+import os
+import time
+import asyncio
+import argparse
+from datetime import datetime
+from typing import Dict, Any, List
+
+from .database import SessionLocal, Supplier, RiskRefreshRun, init_db, upsert_supplier_analyses
+from .rag import agenerate_pestel_analysis, close_http_client, DEFAULT_PESTEL_RESULT, PESTEL_TTL
+from shared.langfuse_config import get_langfuse_client, shutdown_langfuse
+
+DEFAULT_CONCURRENCY = int(os.getenv("RISK_REFRESH_CONCURRENCY", "8"))
+
+def _load_suppliers(only_stale: bool) -> List[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        query = db.query(Supplier.name, Supplier.country, Supplier.last_updated, Supplier.pestel_data)
+        rows = []
+        cutoff = datetime.utcnow() - PESTEL_TTL
+        for row in query.all():
+            if only_stale and row.pestel_data and row.last_updated and row.last_updated >= cutoff:
+                continue
+            rows.append({"name": row.name, "country": row.country})
+        return rows
+    finally:
+        db.close()
+
+def _bulk_write(results: List[Dict[str, Any]]):
+    # One multi-row INSERT ... ON CONFLICT DO UPDATE for the whole run
+    db = SessionLocal()
+    try:
+        upsert_supplier_analyses(db, results)
+        db.commit()
+    finally:
+        db.close()
+
+def _record_run(run: Dict[str, Any]):
+    db = SessionLocal()
+    try:
+        db.add(RiskRefreshRun(**run))
+        db.commit()
+    finally:
+        db.close()
+
+async def refresh_all(concurrency: int = DEFAULT_CONCURRENCY, only_stale: bool = False) -> Dict[str, Any]:
+    started_at = datetime.utcnow()
+    started = time.perf_counter()
+    suppliers = await asyncio.to_thread(_load_suppliers, only_stale)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    failed = 0
+
+    async def analyze(supplier: Dict[str, Any]):
+        nonlocal failed
+        async with semaphore:
+            try:
+                analysis = await agenerate_pestel_analysis(supplier["name"], supplier["country"])
+            except Exception as e:
+                print(f"Refresh failed for {supplier['name']} ({supplier['country']}): {e}")
+                failed += 1
+                return None
+            if analysis == DEFAULT_PESTEL_RESULT:
+                # Don't overwrite a real analysis with the neutral fallback
+                failed += 1
+                return None
+            return {
+                "name": supplier["name"],
+                "country": supplier["country"],
+                "risk_score": analysis.get("risk_score", 50),
+                "pestel_data": analysis,
+                "last_updated": datetime.utcnow(),
+            }
+
+    results = [r for r in await asyncio.gather(*(analyze(s) for s in suppliers)) if r]
+    await asyncio.to_thread(_bulk_write, results)
+
+    duration = time.perf_counter() - started
+    run = {
+        "started_at": started_at,
+        "duration_seconds": round(duration, 3),
+        "suppliers_total": len(suppliers),
+        "suppliers_refreshed": len(results),
+        "suppliers_failed": failed,
+        "suppliers_per_second": round(len(results) / duration, 3) if duration > 0 else None,
+        "concurrency": concurrency,
+    }
+    await asyncio.to_thread(_record_run, run)
+    print(f"✅ Refreshed {len(results)}/{len(suppliers)} suppliers in {duration:.1f}s "
+          f"({run['suppliers_per_second']} suppliers/s, concurrency {concurrency}, {failed} failed)")
+    return run
+
+async def _main(concurrency: int, only_stale: bool):
+    try:
+        await refresh_all(concurrency=concurrency, only_stale=only_stale)
+    finally:
+        await close_http_client()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk PESTEL refresh for all suppliers")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--only-stale", action="store_true", help="Skip suppliers whose analysis is still within PESTEL_TTL_SECONDS")
+    args = parser.parse_args()
+
+    get_langfuse_client()
+    init_db()
+    asyncio.run(_main(args.concurrency, args.only_stale))
+    shutdown_langfuse()
+
+if __name__ == "__main__":
+    main()
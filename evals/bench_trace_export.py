@@ -0,0 +1,80 @@
+"""
+Benchmark: request latency with inline langfuse.flush() vs. batched background export.
+
+Simulates a request handler that records a span + generation (the shape used by
+the supplier and materials agents) and measures per-request latency:
+
+  inline   -> handler calls langfuse.flush() before returning (old behaviour)
+  batched  -> handler returns immediately; the batch processor exports later
+
+Requires a reachable Langfuse server (LANGFUSE_HOST / keys as for the agents).
+
+Usage:
+    python evals/bench_trace_export.py [--requests 200] [--work-ms 5]
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.langfuse_config import get_langfuse_client, shutdown_langfuse
+
+def handle_request(langfuse, i: int, work_ms: float, inline_flush: bool):
+    with langfuse.start_as_current_observation(
+        as_type="span",
+        name="bench-request",
+        input={"request": i},
+        metadata={"benchmark": "trace-export"}
+    ) as span:
+        with langfuse.start_as_current_observation(
+            as_type="generation",
+            name="bench-generation",
+            model="bench",
+            input=[{"role": "user", "content": f"request {i}"}]
+        ) as gen:
+            time.sleep(work_ms / 1000)  # stand-in for real handler work
+            gen.update(output={"ok": True})
+        span.update(output={"ok": True})
+    if inline_flush:
+        langfuse.flush()
+
+def percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run(langfuse, n: int, work_ms: float, inline_flush: bool):
+    latencies = []
+    for i in range(n):
+        started = time.perf_counter()
+        handle_request(langfuse, i, work_ms, inline_flush)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--work-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    langfuse = get_langfuse_client()
+    results = {}
+    for mode, inline in (("inline", True), ("batched", False)):
+        run(langfuse, 10, args.work_ms, inline)  # warm-up
+        results[mode] = run(langfuse, args.requests, args.work_ms, inline)
+
+    print(f"{'mode':<10}{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}")
+    for mode, samples in results.items():
+        print(f"{mode:<10}{percentile(samples, 50):>10.2f}{percentile(samples, 99):>10.2f}{statistics.mean(samples):>10.2f}")
+
+    inline_p50, batched_p50 = percentile(results["inline"], 50), percentile(results["batched"], 50)
+    inline_p99, batched_p99 = percentile(results["inline"], 99), percentile(results["batched"], 99)
+    print(f"\np50 saved: {inline_p50 - batched_p50:.2f} ms, p99 saved: {inline_p99 - batched_p99:.2f} ms")
+
+    shutdown_langfuse()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Offline check for hedged and multi-query search (no API keys or network).
+
+Uses the Brave mock as the fast provider and small stubs for slow and
+failing providers to exercise the subtle paths of HedgedSearchTool:
+
+  fast primary     -> answers before the hedge delay, no backup request
+  slow primary     -> backup is sent after `hedge_after`, first answer wins,
+                      the slow request is cancelled
+  failing primary  -> next provider is tried at once, without waiting
+  all fail         -> the last error is returned
+  amulti_search    -> duplicate queries are sent once, repeated lines kept once
+
+Usage:
+    python evals/check_hedged_search.py
+"""
+import os
+import sys
+import time
+import asyncio
+from typing import Any, Dict
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from shared.tools.base import SearchInterface
+from shared.tools.search import BraveSearchTool, HedgedSearchTool
+
+class StubSearchTool(SearchInterface):
+    def __init__(self, name: str, delay: float = 0.0, error: str = None):
+        self._name = name
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return f"Stub provider {self._name}"
+
+    def search(self, query: str) -> Dict[str, Any]:
+        return asyncio.run(self.asearch(query))
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            return {"error": self.error}
+        return {"query": query, "result": f"{self._name} result for: {query}\nshared line"}
+
+def brave() -> BraveSearchTool:
+    return BraveSearchTool(api_key="offline-mock")
+
+async def check_fast_primary():
+    hedged = HedgedSearchTool([brave(), StubSearchTool("backup")], hedge_after=0.05)
+    result = await hedged.asearch("brake pads")
+    assert result["provider"] == "brave_search", result
+    assert hedged.hedges_sent == 0, hedged.stats()
+
+async def check_slow_primary():
+    slow = StubSearchTool("slow", delay=1.0)
+    hedged = HedgedSearchTool([slow, brave()], hedge_after=0.05)
+    started = time.perf_counter()
+    result = await hedged.asearch("brake pads")
+    elapsed = time.perf_counter() - started
+    await asyncio.sleep(0)  # let the cancellation reach the stub
+    assert result["provider"] == "brave_search", result
+    assert hedged.hedges_sent == 1, hedged.stats()
+    assert elapsed < 0.5, f"hedge did not cut latency ({elapsed:.2f}s)"
+    assert slow.cancelled == 1, "slow request was not cancelled"
+
+async def check_failing_primary():
+    failing = StubSearchTool("failing", error="quota exceeded")
+    hedged = HedgedSearchTool([failing, brave()], hedge_after=5.0)
+    started = time.perf_counter()
+    result = await hedged.asearch("brake pads")
+    assert result["provider"] == "brave_search", result
+    assert time.perf_counter() - started < 1.0, "waited for the hedge delay after an error"
+    assert hedged.hedges_sent == 0, hedged.stats()
+
+async def check_all_fail():
+    keyless = BraveSearchTool()
+    keyless.api_key = None  # the Brave mock returns an error without a key
+    hedged = HedgedSearchTool([StubSearchTool("slow-failing", delay=0.1, error="timeout"), keyless], hedge_after=0.05)
+    result = await hedged.asearch("brake pads")
+    assert "error" in result and "provider" not in result, result
+    assert sum(hedged.wins.values()) == 0, hedged.stats()
+
+async def check_multi_search():
+    stub = StubSearchTool("stub")
+    result = await stub.amulti_search(["Brake Pads", "brake  pads", "rotors"])
+    assert stub.calls == 2, f"duplicate query was sent ({stub.calls} calls)"
+    assert result["result"].splitlines().count("shared line") == 1, result["result"]
+    assert not result["errors"], result
+
+CHECKS = [check_fast_primary, check_slow_primary, check_failing_primary, check_all_fail, check_multi_search]
+
+def main():
+    failed = 0
+    for check in CHECKS:
+        try:
+            asyncio.run(check())
+            print(f"✅ {check.__name__}")
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {check.__name__}: {e}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -1,17 +1,63 @@
 """
 Shared Langfuse configuration and helper utilities for all agents.
+
+Traces are exported by a background batch processor: spans are queued in
+memory and shipped every LANGFUSE_FLUSH_INTERVAL seconds or once
+LANGFUSE_FLUSH_AT spans are buffered. Request handlers never flush; agents
+call shutdown_langfuse() on shutdown to drain the queue.
+
+Tuning (env):
+    LANGFUSE_FLUSH_AT          spans per export batch (default 512)
+    LANGFUSE_FLUSH_INTERVAL    seconds between exports (default 5)
+    LANGFUSE_MAX_QUEUE_SIZE    spans buffered before new ones are dropped (default 2048)
+    LANGFUSE_SAMPLE_RATE       fraction of traces kept, for shedding load (default 1.0)
+
+Drop policy: fixed, not configurable. Langfuse exports through the
+OpenTelemetry BatchSpanProcessor, which drops newly ended spans when its
+queue is full and never blocks the caller. A blocking policy would put
+export back on the request path, which is what this setup avoids. To shed
+load earlier, lower LANGFUSE_SAMPLE_RATE.
+
+The queue bound can only be passed through the process-wide
+OTEL_BSP_MAX_QUEUE_SIZE variable. It is set only if unset, so an explicit
+OTEL_BSP_MAX_QUEUE_SIZE wins, and it also applies to any other OTel batch
+processor in the same process.
 """
 import os
 from langfuse import Langfuse
 
+# Common configuration
+LANGFUSE_ENABLED = os.getenv("LANGFUSE_ENABLED", "true").lower() == "true"
+FLUSH_AT = int(os.getenv("LANGFUSE_FLUSH_AT", "512"))
+FLUSH_INTERVAL = float(os.getenv("LANGFUSE_FLUSH_INTERVAL", "5"))
+MAX_QUEUE_SIZE = int(os.getenv("LANGFUSE_MAX_QUEUE_SIZE", "2048"))
+SAMPLE_RATE = float(os.getenv("LANGFUSE_SAMPLE_RATE", "1.0"))
+
+_client = None
+
 # Initialize Langfuse client
 def get_langfuse_client():
-    """Get configured Langfuse client"""
-    return Langfuse(
-        secret_key=os.getenv("LANGFUSE_SECRET_KEY", "sk-lf-secret"),
-        public_key=os.getenv("LANGFUSE_PUBLIC_KEY", "pk-lf-public"),
-        host=os.getenv("LANGFUSE_HOST", "http://langfuse:3000"),
-    )
+    """
+    Get the process-wide Langfuse client, configured for batched background export.
+    Once created, langfuse.get_client() elsewhere in the agent returns this instance.
+    """
+    global _client
+    if _client is None:
+        # The batch span processor reads its queue bound only from the OTel env var
+        # (see module docstring). When full it drops new spans; it never blocks.
+        os.environ.setdefault("OTEL_BSP_MAX_QUEUE_SIZE", str(MAX_QUEUE_SIZE))
+        _client = Langfuse(
+            secret_key=os.getenv("LANGFUSE_SECRET_KEY", "sk-lf-secret"),
+            public_key=os.getenv("LANGFUSE_PUBLIC_KEY", "pk-lf-public"),
+            host=os.getenv("LANGFUSE_HOST", "http://langfuse:3000"),
+            tracing_enabled=LANGFUSE_ENABLED,
+            flush_at=FLUSH_AT,
+            flush_interval=FLUSH_INTERVAL,
+            sample_rate=SAMPLE_RATE,
+        )
+    return _client
 
-# Common configuration
-LANGFUSE_ENABLED = os.getenv("LANGFUSE_ENABLED", "true").lower() == "true"
+def shutdown_langfuse():
+    """Drain queued spans. Call from the agent's shutdown hook, never per request."""
+    if _client is not None:
+        _client.shutdown()
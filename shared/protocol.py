@@ -8,6 +8,18 @@ from enum import Enum
 
 # --- Google Agent-to-Agent (A2A) Protocol ---
 
+class SkillRoute(BaseModel):
+    """Lets the orchestrator call a skill directly, without the LLM, for unambiguous requests."""
+    triggers: List[str] # Case-insensitive regexes; one must match the user message
+    entity_source: str # Path on the agent returning [{"match": <name>, "args": {<skill params>}}]
+
+class CacheHint(BaseModel):
+    """Tells the orchestrator whether it may reuse a skill's results for identical arguments."""
+    cacheable: bool = False # Skill is idempotent: same arguments -> same result within the TTL
+    ttl_seconds: Optional[float] = None # How long a result stays valid (orchestrator default if unset)
+    cost: float = 1.0 # Relative cost of a call (e.g. 1 = DB lookup, 10 = LLM call); cheap entries are evicted first
+    skip_if: List[str] = [] # Don't cache a result (or any item of a list result) with one of these fields truthy, e.g. "stale"
+
 class AgentSkill(BaseModel):
     id: str
     name: str
@@ -16,6 +28,9 @@ class AgentSkill(BaseModel):
     outputModes: List[str] = ["text"]
     parameters: Dict[str, Any] # JSON Schema for the skill input
     instructions: Optional[str] = None # Instructions for the orchestrator on when/how to use this skill
+    timeout_seconds: Optional[float] = None # Per-call timeout the orchestrator applies when forwarding this skill
+    route: Optional[SkillRoute] = None # Optional deterministic fast-path routing hint
+    cache: Optional[CacheHint] = None # Result caching hint; falls back to the agent card's hint
 
 class AgentCapabilities(BaseModel):
     streaming: bool = False
@@ -30,6 +45,7 @@ class AgentCard(BaseModel):
     provider: str = "Google Antigravity"
     capabilities: AgentCapabilities = Field(default_factory=AgentCapabilities)
     skills: List[AgentSkill]
+    cache: Optional[CacheHint] = None # Default caching hint for skills that do not set their own
     
     # Optional: Authentication scheme (simplified for this demo)
     authentication: Dict[str, Any] = Field(default_factory=lambda: {"type": "none"})
@@ -1,5 +1,6 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 class BaseTool(ABC):
     """Abstract base class for all tools in the Tools Hub."""
@@ -24,3 +25,36 @@ class SearchInterface(BaseTool):
         Returns a dictionary with at least 'query' and 'result' (text content).
         """
         pass
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        """
+        Async search. Providers with a native async client override this;
+        the default runs the blocking search() in a worker thread so it never
+        blocks the event loop.
+        """
+        return await asyncio.to_thread(self.search, query)
+
+    async def amulti_search(self, queries: List[str]) -> Dict[str, Any]:
+        """
+        Runs several queries concurrently and merges their results. A line
+        repeated across answers is kept once, at its first occurrence.
+        """
+        unique = {}
+        for q in queries:
+            unique.setdefault(" ".join(q.lower().split()), q)
+        queries = list(unique.values())
+        results = await asyncio.gather(*(self.asearch(q) for q in queries))
+        seen = set()
+        merged_lines = []
+        for result in results:
+            for line in result.get("result", "").splitlines():
+                key = " ".join(line.lower().split())
+                if key and key not in seen:
+                    seen.add(key)
+                    merged_lines.append(line.strip())
+        return {
+            "queries": queries,
+            "result": "\n".join(merged_lines),
+            "results": results,
+            "errors": [r["error"] for r in results if "error" in r],
+        }
@@ -1,5 +1,10 @@
 import os
-from typing import Dict, Any, Optional
+import re
+import asyncio
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 import google.generativeai as genai
 from .base import SearchInterface
 
@@ -34,6 +39,19 @@ class GoogleSearchTool(SearchInterface):
         except Exception as e:
             return {"error": f"Error searching with Gemini: {e}"}
 
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        if not self.model:
+            return {"error": "GOOGLE_API_KEY not set."}
+
+        try:
+            response = await self.model.generate_content_async(
+                query,
+                tools='google_search_retrieval'
+            )
+            return {"query": query, "result": response.text}
+        except Exception as e:
+            return {"error": f"Error searching with Gemini: {e}"}
+
 class BraveSearchTool(SearchInterface):
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("BRAVE_API_KEY")
@@ -56,8 +74,187 @@ class BraveSearchTool(SearchInterface):
             "result": f"[MOCK] Brave Search result for: {query}. (Implement actual API call here)"
         }
 
-def get_search_tool(provider: str = "google") -> SearchInterface:
-    """Factory to get the configured search tool."""
-    if provider.lower() == "brave":
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        # The mock is pure CPU; no need for a worker thread
+        return self.search(query)
+
+class HedgedSearchTool(SearchInterface):
+    """
+    Composite provider. asearch() sends the query to the first provider and,
+    if it hasn't answered within `hedge_after` seconds, also to the next one;
+    the first non-error answer wins and the rest are cancelled.
+    """
+
+    def __init__(self, providers: List[SearchInterface], hedge_after: float = 1.5):
+        if not providers:
+            raise ValueError("HedgedSearchTool needs at least one provider")
+        self.providers = providers
+        self.hedge_after = hedge_after
+        self.hedges_sent = 0
+        self.wins: Dict[str, int] = {p.name: 0 for p in providers}
+
+    @property
+    def name(self) -> str:
+        return "hedged_search"
+
+    @property
+    def description(self) -> str:
+        return "Search the web with " + ", ".join(p.name for p in self.providers) + ", hedging slow requests."
+
+    def search(self, query: str) -> Dict[str, Any]:
+        return asyncio.run(self.asearch(query))
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        pending = {}
+        last_error: Dict[str, Any] = {"error": "No search provider returned a result."}
+        remaining = list(self.providers)
+
+        def launch():
+            provider = remaining.pop(0)
+            pending[asyncio.ensure_future(provider.asearch(query))] = provider
+
+        launch()
+        try:
+            while pending:
+                # Wait for an answer, but only up to the hedge delay while backups remain
+                timeout = self.hedge_after if remaining else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedges_sent += 1
+                    launch()
+                    continue
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = {"error": f"Error searching with {provider.name}: {e}"}
+                    if "error" not in result:
+                        self.wins[provider.name] += 1
+                        return {**result, "provider": provider.name}
+                    last_error = result
+                # Everything in flight failed: fall through to the next provider immediately
+                if not pending and remaining:
+                    launch()
+            return last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hedge_after": self.hedge_after, "hedges_sent": self.hedges_sent, "wins": dict(self.wins)}
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query.strip().lower())
+
+class SearchCache:
+    """Process-wide LRU cache of search results with a TTL, shared by all providers."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, provider: str, query: str) -> Optional[Dict[str, Any]]:
+        key = (provider, normalize_query(query))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, provider: str, query: str, result: Dict[str, Any]):
+        key = (provider, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+search_cache = SearchCache(
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600")),
+)
+
+class CachedSearchTool(SearchInterface):
+    """Wraps a provider with the shared search cache. Errors are never cached."""
+
+    def __init__(self, provider: SearchInterface, cache: SearchCache = search_cache):
+        self.provider = provider
+        self.cache = cache
+
+    @property
+    def name(self) -> str:
+        return self.provider.name
+
+    @property
+    def description(self) -> str:
+        return self.provider.description
+
+    def search(self, query: str) -> Dict[str, Any]:
+        cached = self.cache.get(self.name, query)
+        if cached is not None:
+            return cached
+        result = self.provider.search(query)
+        if "error" not in result:
+            self.cache.set(self.name, query, result)
+        return result
+
+    async def asearch(self, query: str) -> Dict[str, Any]:
+        cached = self.cache.get(self.name, query)
+        if cached is not None:
+            return cached
+        result = await self.provider.asearch(query)
+        if "error" not in result:
+            self.cache.set(self.name, query, result)
+        return result
+
+_providers: Dict[str, SearchInterface] = {}
+_providers_lock = threading.Lock()
+
+def _create_search_tool(provider: str) -> SearchInterface:
+    if provider == "brave":
         return BraveSearchTool()
+    if provider == "hedged":
+        names = [n.strip().lower() for n in os.getenv("SEARCH_HEDGE_PROVIDERS", "google,brave").split(",") if n.strip()]
+        return HedgedSearchTool(
+            [_create_search_tool(n) for n in names if n != "hedged"],
+            hedge_after=float(os.getenv("SEARCH_HEDGE_AFTER_MS", "1500")) / 1000,
+        )
     return GoogleSearchTool()
+
+def get_search_tool(provider: str = "google") -> SearchInterface:
+    """
+    Factory to get the configured search tool.
+    Providers are created once per process and wrapped with the shared cache.
+    """
+    provider = provider.lower()
+    with _providers_lock:
+        tool = _providers.get(provider)
+        if tool is None:
+            tool = CachedSearchTool(_create_search_tool(provider))
+            _providers[provider] = tool
+    return tool
+
+def search_cache_stats() -> Dict[str, Any]:
+    return search_cache.stats()
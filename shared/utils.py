@@ -3,9 +3,10 @@ import os
 import time
 import threading
 
-def register_agent(agent_name: str, port: int, skills: list):
+def register_agent(agent_name: str, port: int, skills: list, cache: dict = None):
     """
     Registers the agent with the Orchestrator using the Google A2A Agent Card format.
+    `cache` is an optional agent-wide CacheHint for skills that do not set their own.
     """
     orchestrator_url = os.getenv("ORCHESTRATOR_URL", "http://orchestrator:8003")
     
@@ -19,7 +20,8 @@ def register_agent(agent_name: str, port: int, skills: list):
             "streaming": True,
             "pushNotifications": False
         },
-        "skills": skills
+        "skills": skills,
+        "cache": cache
     }
     
     def _register():
@@ -42,6 +44,18 @@ def register_agent(agent_name: str, port: int, skills: list):
     thread.daemon = True
     thread.start()
 
+def invalidate_orchestrator_cache(agent_name: str):
+    """
+    Asks the Orchestrator to drop its cached tool results for this agent,
+    e.g. after the agent's underlying data changed.
+    """
+    orchestrator_url = os.getenv("ORCHESTRATOR_URL", "http://orchestrator:8003")
+    try:
+        response = requests.post(f"{orchestrator_url}/tool-cache/invalidate/{agent_name}", timeout=5)
+        response.raise_for_status()
+    except Exception as e:
+        print(f"Could not invalidate Orchestrator cache for {agent_name}: {e}")
+
 def load_cars_data() -> dict:
     """Load static car dataset from shared/data/cars.json.
     Returns a dict with a list of cars and their suppliers/materials.